@@ -0,0 +1,42 @@
+import sys
+import pathlib
+import timeit
+
+
+root = pathlib.Path(__file__).absolute().parent
+
+
+sys.path.append(str(root.parent))
+
+
+import hextile
+
+
+examples = root.parent / 'examples'
+
+
+def recompiled(junk: hextile.Junk, **context) -> str:
+    junk._templates.clear()
+    return junk.render(**context)
+
+
+def memoized(junk: hextile.Junk, **context) -> str:
+    return junk.render(**context)
+
+
+def main(argv):
+    if len(argv) > 2:
+        print(f'USAGE: {argv[0]} [repeat]')
+        return 1
+    repeat = int(argv[1]) if len(argv) == 2 else 1000
+    junk = hextile.transpile(examples / 'multab.template')
+    results = {}
+    for render in (recompiled, memoized):
+        elapsed = min(timeit.repeat(lambda: render(junk, n=10), number=repeat, repeat=5))
+        results[render.__name__] = elapsed / repeat
+        print(f'{render.__name__:<10} {results[render.__name__] * 1e6:8.1f}us per render')
+    print(f'{"speedup":<10} {results["recompiled"] / results["memoized"]:8.2f}x')
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,35 @@
+import sys
+import pathlib
+import timeit
+
+
+root = pathlib.Path(__file__).absolute().parent
+
+
+sys.path.append(str(root.parent))
+
+
+from hextile import splinterpolate
+
+
+lines = {
+    'static': '<div class="container"><p>Hello, world!</p></div>',
+    'simple': '<li class="{item.kind}">{item.name}: {item.value:>10}</li>',
+    'nested': '{", ".join(f"{key}={value!r}" for key, value in {"a": 1, "b": "}"}.items())}',
+    'escaped': 'function f() {{ return {value}; }}',
+    'long': 'text ' * 200 + '{x}' + ' text' * 200,
+}
+
+
+def main(argv):
+    if len(argv) > 2:
+        print(f'USAGE: {argv[0]} [number]')
+        return 1
+    number = int(argv[1]) if len(argv) == 2 else 10000
+    for name, line in lines.items():
+        elapsed = min(timeit.repeat(lambda: list(splinterpolate('{', '}', line)), number=number, repeat=5))
+        print(f'{name:<10} {elapsed / number * 1e6:8.2f}us per line')
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
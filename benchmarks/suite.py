@@ -0,0 +1,149 @@
+import sys
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import platform
+import tempfile
+import time
+
+
+root = pathlib.Path(__file__).absolute().parent
+
+
+sys.path.append(str(root.parent))
+
+
+import hextile
+from hextile.blueprint import parse_lines
+from hextile.splinterpolate import compile_splinters
+
+
+examples = root.parent / 'examples'
+default_sizes = [1_000, 10_000, 100_000, 1_000_000]
+context = dict(items=2, name='item')
+block = '''
+<div class="section-{k}">
+    ! total = 0
+    !for i in range(items):
+        <span>{k}: {{i * 2}} {{name!r}}</span>
+        ! total += i
+    !if total > 3:
+        total {{total:>8}}
+    !else:
+        small
+    static text
+</div>
+'''.strip()
+block_size = block.count('\n') + 1
+
+
+# The scenarios of examples/generate.py, with the output written to a temporary directory rather than the examples
+# (except for dirs2, which reads the output of dirs from the examples directory).
+scenarios = {
+    'simple': ('simple.template', lambda directory: dict(n=10)),
+    'multab': ('multab.template', lambda directory: dict(n=10)),
+    'dirs': ('dirs.template', lambda directory: dict(root=directory)),
+    'html': ('index.template', lambda directory: dict(
+        n = 10,
+        description = 'Description',
+        components_directory = examples / 'components',
+        build_directory = directory / 'build',
+        output_directory = directory / 'output',
+    )),
+}
+
+
+def generate(size: int) -> str:
+    blocks = (block.format(k=k) for k in range(-(-size // block_size)))
+    return '\n'.join('\n'.join(blocks).splitlines()[:size])
+
+
+def measure(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_size(size: int, repeat: int) -> dict[str, float]:
+    text = generate(size)
+    lines = text.splitlines()
+    transpilers = hextile.Transpiler.resolve()
+    blueprint = hextile.Blueprint('synthetic', None, text, {})
+    junk = hextile.Junk(blueprint, transpilers)
+    def transpile():
+        compile_splinters.cache_clear()
+        junk.transpile()
+    def compile():
+        junk._templates.clear()
+        junk.compile()
+    results = dict(
+        parse_lines = measure(lambda: parse_lines(text, 'synthetic'), repeat),
+        splinterpolate = measure(lambda: [list(hextile.splinterpolate('{', '}', line)) for line in lines], repeat),
+        transpile = measure(transpile, repeat),
+        compile = measure(compile, repeat),
+    )
+    template = junk.compile()
+    results['render'] = measure(lambda: template.render(dict(context)), repeat)
+    return results
+
+
+def benchmark_scenario(name: str, repeat: int) -> dict[str, float|str]:
+    path, get_context = scenarios[name]
+    # The filesystem transpiler changes the working directory while rendering.
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        try:
+            def transpile():
+                hextile.Blueprint.cache.clear()
+                return hextile.transpile(examples / path)
+            results = dict(transpile=measure(transpile, repeat))
+            template = transpile().compile()
+            results['render'] = measure(lambda: template.render(get_context(directory)), repeat)
+        except Exception as error:
+            return dict(error=f'{type(error).__name__}: {error}')
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmark parsing, interpolating, transpiling, compiling and rendering.')
+    parser.add_argument('-o', '--output', help='the JSON file to write the results to (default: stdout)')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=default_sizes, help='the synthetic blueprint sizes, in lines')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='how many times to repeat each measurement (the minimum is reported)')
+    parser.add_argument('--no-scenarios', action='store_true', help='skip the examples/generate.py scenarios')
+    args = parser.parse_args(argv[1:])
+    results = dict(
+        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        python = platform.python_version(),
+        implementation = platform.python_implementation(),
+        platform = platform.platform(),
+        repeat = args.repeat,
+        sizes = {},
+        scenarios = {},
+    )
+    for size in args.sizes:
+        results['sizes'][size] = benchmark_size(size, args.repeat)
+        print(f'{size:>10} lines ' + ' '.join(f'{phase}={elapsed * 1000:.1f}ms' for phase, elapsed in results['sizes'][size].items()), file=sys.stderr)
+    if not args.no_scenarios:
+        for name in scenarios:
+            results['scenarios'][name] = benchmark_scenario(name, args.repeat)
+            print(f'{name:>10} ' + ' '.join(
+                f'{phase}={value * 1000:.1f}ms' if isinstance(value, float) else f'{phase}={value}'
+                for phase, value in results['scenarios'][name].items()
+            ), file=sys.stderr)
+    output = json.dumps(results, indent=4)
+    if args.output:
+        pathlib.Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -34,6 +34,8 @@ def dirs2():
 def html():
     junk = hextile.transpile(root / 'index.template')
     print(junk.render(
+        n = 10,
+        description = 'Description',
         components_directory = root / 'components',
         build_directory = root / 'build',
         output_directory = root / 'output',
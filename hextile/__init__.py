@@ -1,6 +1,15 @@
-from .blueprint import Blueprint, Line
+__version__ = '0.1.0'
+
+from .blueprint import Blueprint, BlueprintCache, Line, LineView
 from .transpiler import Transpiler, TranspilerState, transpiler, transpile
 from .junk import Junk, JunkPlaceholder
+from .cache import JunkCache
+from .builder import Builder, BuildTarget
+from .watch import Watcher, watch
+from .template import Renderer, Template
+from .profiler import Profile
+from .sourcemap import SourceMap
+from .stats import TranspileStats
 from .splinterpolate import splinterpolate, Splinter
 
 from . import transpilers
@@ -8,15 +17,27 @@ from . import transpilers
 
 __all__ = [
     'Blueprint',
+    'BlueprintCache',
+    'Builder',
+    'BuildTarget',
     'Junk',
+    'JunkCache',
     'JunkPlaceholder',
     'Line',
+    'LineView',
+    'Profile',
+    'Renderer',
     'Splinter',
+    'SourceMap',
     'splinterpolate',
+    'Template',
     'Transpiler',
     'TranspilerExtension',
     'TranspilerState',
+    'TranspileStats',
     'transpile',
     'transpiler',
     'transpilers',
+    'watch',
+    'Watcher',
 ]
\ No newline at end of file
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import Any
+
+import argparse
+import json
+import multiprocessing
+import pathlib
+import sys
+import time
+
+from .builder import BuildTarget
+from .cache import JunkCache
+
+
+description = '''
+Transpile and render the targets of a JSON manifest:
+
+    {
+        "cache": "path/to/cache",
+        "targets": [
+            {
+                "blueprint": "path/to/blueprint",
+                "transpilers": ["html"],
+                "core": true,
+                "settings": {"static_path": "/static/"},
+                "output": "path/to/output",
+                "context": {"n": 10}
+            }
+        ]
+    }
+
+Only "blueprint" is required; paths are relative to the manifest's directory.
+'''
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='hextile')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='build the targets of a manifest', description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    build.add_argument('manifest', help='the path to the manifest')
+    build.add_argument('-j', '--jobs', type=positive_int, default=1, help='the number of worker processes (default: 1)')
+    build.add_argument('-c', '--cache', help='the junk cache directory (overrides the manifest)')
+    build.add_argument('-r', '--report', help='the path to write a JSON report of the build to')
+    args = parser.parse_args(argv)
+    return run_build(args.manifest, args.jobs, args.cache, args.report)
+
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'expected a positive integer, got {value!r}')
+    return number
+
+
+def run_build(manifest: str|pathlib.Path, jobs: int = 1, cache: str|pathlib.Path = None, report: str|pathlib.Path = None) -> int:
+    manifest = pathlib.Path(manifest).absolute()
+    targets, manifest_cache = load_manifest(manifest)
+    if cache is None:
+        cache = manifest_cache
+    if cache is not None:
+        cache = str(pathlib.Path(cache).absolute())
+    start = time.perf_counter()
+    tasks = [(target, cache) for target in targets]
+    if jobs == 1:
+        results = [build_target(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            results = pool.map(build_target, tasks)
+    elapsed = time.perf_counter() - start
+    width = max([len('target'), *(len(result['blueprint']) for result in results)])
+    print(f'{"target":<{width}} {"transpile (ms)":>15} {"render (ms)":>12}', file=sys.stderr)
+    for result in results:
+        line = f'{result["blueprint"]:<{width}} {result["transpile"] * 1000:>15.1f} {result["render"] * 1000:>12.1f}'
+        if result['error']:
+            line += f'  {result["error"]}'
+        print(line, file=sys.stderr)
+    failed = sum(1 for result in results if result['error'])
+    print(f'built {len(results) - failed} targets ({failed} failed) in {elapsed * 1000:.1f}ms with {jobs} jobs', file=sys.stderr)
+    if report:
+        pathlib.Path(report).write_text(json.dumps(dict(jobs=jobs, time=elapsed, targets=results), indent=4))
+    return 1 if failed else 0
+
+
+def load_manifest(manifest: pathlib.Path) -> tuple[list[BuildTarget], None|pathlib.Path]:
+    data = json.loads(manifest.read_text())
+    if isinstance(data, list):
+        data = dict(targets=data)
+    directory = manifest.parent
+    cache = data.get('cache')
+    if cache is not None:
+        cache = directory / cache
+    targets = []
+    for config in data['targets']:
+        output = config.get('output')
+        targets.append(BuildTarget(
+            blueprint = directory / config['blueprint'],
+            transpilers = tuple(config.get('transpilers', ())),
+            core = config.get('core', True),
+            settings = config.get('settings', {}),
+            output = directory / output if output is not None else None,
+            context = config.get('context', {}),
+        ))
+    return targets, cache
+
+
+def build_target(task: tuple[BuildTarget, None|str]) -> dict[str, Any]:
+    target, cache = task
+    if cache is not None:
+        cache = JunkCache(cache)
+    result = dict(blueprint=str(target.path), output=str(target.output) if target.output else None, transpile=0.0, render=0.0, error=None)
+    start = time.perf_counter()
+    try:
+        target.transpile(cache)
+    except Exception as error:
+        target.error = error
+    result['transpile'] = time.perf_counter() - start
+    start = time.perf_counter()
+    target.render()
+    result['render'] = time.perf_counter() - start
+    if target.error:
+        result['error'] = f'{type(target.error).__name__}: {target.error}'
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from types import CodeType
+from typing import Callable
+
+import ast
+
+
+render_function_name = '__render__'
+render_function_template = '''
+def __render__(__context__, {parameters}):
+    try:
+        pass
+    finally:
+        __locals__ = locals()
+        for __binding__ in __bindings__:
+            if __binding__ in __locals__:
+                __context__[__binding__] = __locals__[__binding__]
+            else:
+                __context__.pop(__binding__, None)
+globals().pop('__render__')(globals(), {parameters})
+'''
+binding_template = '''
+if __binding__ in __context__:
+    __binding__ = __context__[__binding__]
+'''
+
+
+def compile_module(tree: ast.Module, name: str, preamble_size: int) -> CodeType:
+    return compile(tree, name, 'exec')
+
+
+def compile_function(tree: ast.Module, name: str, preamble_size: int) -> CodeType:
+    """
+    Compiles the generated code into a module that defines the imports and definitions, and runs the rest in a
+    function, so that the emitting builtins, loop variables and so on are fast locals rather than globals.
+
+    To keep the module semantics, variables assigned by the code are initialized from the context if they're in it,
+    and written back into it (or removed from it, if they were deleted) when the function returns. Names bound
+    dynamically (e.g. by exec) aren't locals the compiler knows of, so they're neither visible to the rest of the code
+    nor written back; this is why the function backend is opt-in (e.g. junk.compile(backend='function')).
+
+    Falls back to compiling a module if the code can't run in a function (e.g. it uses a star import).
+    """
+    preamble = [statement for statement in tree.body if statement.lineno <= preamble_size]
+    body = [statement for statement in tree.body if statement.lineno > preamble_size]
+    if not body:
+        return compile_module(tree, name, preamble_size)
+    lineno = body[0].lineno
+    parameters = ', '.join(render_parameters())
+    # Names declared global anywhere (e.g. in a !.function) must stay globals in the render function as well.
+    global_names = sorted({
+        name
+        for statement in body
+        for node in ast.walk(statement) if isinstance(node, ast.Global)
+        for name in node.names
+    })
+    body = [statement for statement in body if not isinstance(statement, ast.Global)] or [ast.copy_location(ast.Pass(), body[0])]
+    if global_names:
+        body.insert(0, ast.copy_location(ast.Global(global_names), body[0]))
+    try:
+        probe = parse_at(render_function_template.format(parameters=parameters), lineno)
+        function, call = probe.body
+        function.body = body
+        code = compile(ast.Module([function], []), name, 'exec')
+    except SyntaxError:
+        return compile_module(tree, name, preamble_size)
+    function_code = next(const for const in code.co_consts if isinstance(const, CodeType))
+    arguments = function_code.co_argcount
+    bindings = [*function_code.co_varnames[arguments:], *function_code.co_cellvars]
+    bindings = [binding for binding in dict.fromkeys(bindings) if binding not in function_code.co_varnames[:arguments]]
+    module = parse_at(render_function_template.format(parameters=parameters), lineno)
+    function, call = module.body
+    prologue = []
+    for binding in bindings:
+        statement = parse_at(binding_template, lineno).body[0]
+        statement.test.left = ast.Constant(binding)
+        statement.body[0].targets[0].id = binding
+        statement.body[0].value.slice = ast.Constant(binding)
+        prologue.append(statement)
+    loop = function.body[0].finalbody[1]
+    loop.iter = ast.Tuple([ast.Constant(binding) for binding in bindings], ast.Load())
+    function.body[0].body = body
+    function.body[:0] = prologue
+    if global_names:
+        function.body.insert(0, body.pop(0))
+    module.body[:0] = preamble
+    return compile(ast.fix_missing_locations(module), name, 'exec')
+
+
+def render_parameters() -> list[str]:
+    return [Junk.EMIT, Junk.EMIT_BLOCK, Junk.CALL, Junk.CAPTURE]
+
+
+def parse_at(source: str, lineno: int) -> ast.Module:
+    module = ast.parse(source)
+    for node in ast.walk(module):
+        if 'lineno' in node._attributes:
+            node.lineno = node.end_lineno = lineno
+    return module
+
+
+backends: dict[str, Callable[[ast.Module, str, int], CodeType]] = dict(
+    module = compile_module,
+    function = compile_function,
+)
+
+
+from .junk import Junk
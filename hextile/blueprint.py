@@ -1,10 +1,14 @@
 from __future__ import annotations
 from types import FrameType
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
+import collections
 import inspect
+import itertools
 import pathlib
 import re
+import sys
+import threading
 
 
 open_suffix = '\\'
@@ -12,13 +16,41 @@ line_regex = re.compile(r'^(\s*)(.*)$')
 
 
 class Blueprint:
+    """
+    A named, parsed blueprint.
 
-    def __init__(self, name: str, path: pathlib.Path, text: str, settings: dict[str, Any]):
+    Blueprint files are parsed into lines as they're read; if retain_text is false, their text isn't kept in memory as
+    well, and is only read again if it's accessed.
+    """
+
+    cache: BlueprintCache
+    retain_text = True
+
+    def __init__(
+            self,
+            name: str,
+            path: pathlib.Path,
+            text: None|str,
+            settings: dict[str, Any],
+            lines: list[Line] = None,
+    ):
+        if lines is None:
+            lines = parse_lines(text, name=name)
         self.name = name
         self.path = path
-        self.text = text
         self.settings = settings
-        self.lines = parse_lines(self.text, name=self.name)
+        self.lines = lines
+        self._text = text
+    
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            return self.path.read_text()
+        return self._text
+    
+    @property
+    def has_text(self) -> bool:
+        return self._text is not None
     
     def __str__(self) -> str:
         return f'blueprint {self.name!r}'
@@ -49,18 +81,103 @@ class Blueprint:
         else:
             path = pathlib.Path(config).absolute()
         name = path.stem
-        text = path.read_text()
-        return Blueprint(name, path, text, settings)
+        text, lines = cls.cache.get(path, name, cls.retain_text)
+        return Blueprint(name, path, text, settings, lines)
+
+
+class BlueprintCache:
+    """
+    A process-wide LRU of parsed blueprint files, keyed by their absolute path and validated against their
+    modification time and size, so that a partial included many times is only read and parsed once.
+
+    The cached lines are shared by every blueprint resolved from the same file; transpilation only touches them
+    through line views, but they shouldn't be shifted or rewritten directly.
+    """
+
+    line_size = 160
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[pathlib.Path, tuple[int, int, int, str, list[Line]]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f'blueprint cache ({len(self._entries)} entries, {self.size}/{self.max_size} bytes)'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(
+            entries = len(self._entries),
+            size = self.size,
+            max_size = self.max_size,
+            hits = self.hits,
+            misses = self.misses,
+        )
+
+    def get(self, path: pathlib.Path, name: str, retain_text: bool = True) -> tuple[None|str, list[Line]]:
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size) and (entry[3] is not None or not retain_text):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[3:]
+            self.misses += 1
+        if retain_text:
+            text = path.read_text()
+            lines = parse_lines(text, name=name)
+            size = sys.getsizeof(text)
+        else:
+            text = None
+            with path.open() as reader:
+                lines = parse_lines(reader, name=name)
+            size = 0
+        size += self.line_size * count_lines(lines)
+        with self._lock:
+            self._discard(path)
+            if size <= self.max_size:
+                self._entries[path] = stat.st_mtime_ns, stat.st_size, size, text, lines
+                self.size += size
+                while self.size > self.max_size:
+                    self._discard(next(iter(self._entries)))
+        return text, lines
+
+    def invalidate(self, path: pathlib.Path) -> None:
+        with self._lock:
+            self._discard(pathlib.Path(path).absolute())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = self.misses = 0
+
+    def _discard(self, path: pathlib.Path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry:
+            self.size -= entry[2]
 
 
 class Line:
+    """
+    A blueprint line; since large blueprints have millions of them, lines have slots rather than a dictionary, and a
+    children list only once one is added (or the list is accessed).
+    """
+
+    __slots__ = ('name', 'number', 'indent', 'content', '_children')
 
     def __init__(self, name: str, number: int, indent: int, content: str):
         self.name = name
         self.number = number
         self.indent = indent
         self.content = content
-        self.children: list[Line] = []
+        self._children: None|list[Line] = None
 
     def __str__(self) -> str:
         return f'{self.name}:{self.number}'
@@ -68,8 +185,18 @@ class Line:
     def __repr__(self) -> str:
         return f'<{self}>'
 
+    @property
+    def children(self) -> list[Line]:
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    @children.setter
+    def children(self, children: list[Line]) -> None:
+        self._children = children
+
     def recurse(self, callback: Callable[[Line], None]) -> None:
-        for child in self.children:
+        for child in self._iter_children():
             callback(child)
             child.recurse(callback)
     
@@ -82,22 +209,91 @@ class Line:
     
     def shift(self, delta: int) -> None:
         self.indent = max(self.indent + delta, 0)
-        for child in self.children:
+        for child in self._iter_children():
             child.shift(delta)
     
     def align_children(self, to: int = None) -> None:
         if to is None:
             to = self.indent
-        for child in self.children:
+        for child in self._iter_children():
             child.shift(to - child.indent)
 
+    def view(self) -> LineView:
+        return LineView(self)
+
+    def _iter_children(self) -> list[Line]|tuple[()]:
+        return self._children or ()
+
+
+class LineView(Line):
+    """
+    A view of a line, through which its content can be rewritten and its indent shifted without modifying the line
+    itself, so that a parsed blueprint can be transpiled more than once.
+
+    Its children are views as well, created when first accessed; shifts that happen before that are folded into a
+    single clamped offset, i.e. max(indent + offset, floor), which is what shifting them one by one would've yielded.
+    """
+
+    __slots__ = ('line', '_offset', '_floor')
+
+    def __init__(self, line: Line, offset: int = 0, floor: int = 0):
+        self.line = line
+        self.indent = max(line.indent + offset, floor)
+        self.content = line.content
+        self._offset = offset
+        self._floor = floor
+        self._children: list[LineView] = None
+
+    @property
+    def name(self) -> str:
+        return self.line.name
+
+    @property
+    def number(self) -> int:
+        return self.line.number
+
+    @property
+    def children(self) -> list[LineView]:
+        if self._children is None:
+            self._children = [LineView(child, self._offset, self._floor) for child in self.line._iter_children()]
+        return self._children
+
+    @children.setter
+    def children(self, children: list[LineView]) -> None:
+        self._children = children
 
-def parse_lines(text: str, name: str = None) -> list[Line]:
+    def shift(self, delta: int) -> None:
+        self.indent = max(self.indent + delta, 0)
+        self._offset += delta
+        self._floor = max(self._floor + delta, 0)
+        if self._children is not None:
+            for child in self._children:
+                child.shift(delta)
+
+    def view(self) -> LineView:
+        return self
+
+    def _iter_children(self) -> list[LineView]:
+        return self.children
+
+
+Blueprint.cache = BlueprintCache()
+
+
+def parse_lines(text: str|Iterable[str], name: str = None) -> list[Line]:
+    if isinstance(text, str):
+        text = text.splitlines()
+    else:
+        # Splitting each line again makes iterating a file equivalent to splitting its text.
+        text = itertools.chain.from_iterable(line.splitlines() or [''] for line in text)
     lines: list[Line] = []
     stack: list[Line] = []
     open_line: Line = None
-    for number, line in enumerate(text.splitlines(), 1):
+    # Generated blueprints repeat the same lines a lot, so identical contents share one string.
+    contents: dict[str, str] = {}
+    for number, line in enumerate(text, 1):
         indent, content = parse_line(line)
+        content = contents.setdefault(content, content)
         line = Line(name, number, indent, content)
         if open_line:
             line.content = open_line.content[:-len(open_suffix)] + content
@@ -118,6 +314,15 @@ def parse_lines(text: str, name: str = None) -> list[Line]:
     return lines
 
 
+def count_lines(lines: list[Line]) -> int:
+    if not lines:
+        return 0
+    line = lines[-1]
+    while line._children:
+        line = line._children[-1]
+    return line.number
+
+
 def parse_line(line: str) -> tuple[int, str]:
     whitespace, content = line_regex.match(line).groups()
     return len(whitespace), content.strip()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from typing import Any, Iterable
+
+import pathlib
+
+
+class Builder:
+    """
+    Keeps the junk of a set of blueprint files, and given the paths that changed, re-transpiles only the blueprints
+    that depend on them (i.e. that are, include, extend or otherwise read them while transpiling).
+
+        >>> builder = Builder(cache='/path/to/cache')
+        >>> builder.add('/path/to/index.blueprint', 'html')
+        >>> builder.add('/path/to/about.blueprint', 'html')
+        >>> builder.build()
+        >>> builder.update(['/path/to/partials/header.blueprint'])
+        [<build target '/path/to/index.blueprint'>]
+
+        # Targets with an output are rendered into it by render() (and targets without one are rendered for their
+        # side effects, e.g. generating files):
+        >>> builder.add('/path/to/contact.blueprint', 'html', output='/path/to/contact.html', context={'n': 1})
+
+    A changed directory affects the targets that depend on any path in it, and vice versa. Targets that fail to
+    transpile keep their error (and their previous junk, if any), and are retried on every update.
+    """
+
+    def __init__(self, cache: str|pathlib.Path|JunkCache = None):
+        if cache is not None:
+            cache = JunkCache.resolve(cache)
+        self.cache = cache
+        self.targets: dict[pathlib.Path, BuildTarget] = {}
+        self._dependents: dict[pathlib.Path, set[pathlib.Path]] = {}
+
+    def __str__(self) -> str:
+        return f'builder of {len(self.targets)} targets'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def add(
+            self,
+            blueprint: str|pathlib.Path,
+            *transpilers: str|Transpiler,
+            core: bool = True,
+            output: str|pathlib.Path = None,
+            context: dict[str, Any] = None,
+            **settings: Any,
+    ) -> BuildTarget:
+        target = BuildTarget(blueprint, transpilers, core, settings, output, context)
+        if target.path in self.targets:
+            raise ValueError(f'{target} already exists')
+        self.targets[target.path] = target
+        return target
+
+    def remove(self, blueprint: str|pathlib.Path) -> None:
+        path = pathlib.Path(blueprint).absolute()
+        target = self.targets.pop(path)
+        self._unindex(target)
+
+    def build(self, targets: Iterable[BuildTarget] = None) -> list[BuildTarget]:
+        if targets is None:
+            targets = [target for target in self.targets.values() if target.junk is None]
+        built = []
+        for target in targets:
+            self._unindex(target)
+            try:
+                target.transpile(self.cache)
+            except Exception as error:
+                target.error = error
+            else:
+                target.error = None
+            finally:
+                self._index(target)
+            built.append(target)
+        return built
+
+    def affected(self, paths: Iterable[str|pathlib.Path]) -> list[BuildTarget]:
+        affected: set[pathlib.Path] = set()
+        for path in paths:
+            path = pathlib.Path(path).absolute()
+            for candidate in (path, *path.parents):
+                affected.update(self._dependents.get(candidate, ()))
+            # A changed directory affects the targets that depend on the paths in it.
+            for dependency, dependents in self._dependents.items():
+                if path in dependency.parents:
+                    affected.update(dependents)
+        return [target for path, target in self.targets.items() if path in affected or target.error]
+
+    def update(self, paths: Iterable[str|pathlib.Path]) -> list[BuildTarget]:
+        paths = list(paths)
+        for path in paths:
+            Blueprint.cache.invalidate(path)
+        return self.build(self.affected(paths))
+
+    def _index(self, target: BuildTarget) -> None:
+        for dependency in target.dependencies:
+            self._dependents.setdefault(dependency, set()).add(target.path)
+
+    def _unindex(self, target: BuildTarget) -> None:
+        for dependency in target.dependencies:
+            dependents = self._dependents.get(dependency)
+            if dependents is None:
+                continue
+            dependents.discard(target.path)
+            if not dependents:
+                del self._dependents[dependency]
+
+
+class BuildTarget:
+
+    def __init__(
+            self,
+            blueprint: str|pathlib.Path,
+            transpilers: tuple[str|Transpiler, ...],
+            core: bool,
+            settings: dict[str, Any],
+            output: str|pathlib.Path = None,
+            context: dict[str, Any] = None,
+    ):
+        if output is not None:
+            output = pathlib.Path(output).absolute()
+        if context is None:
+            context = {}
+        self.path = pathlib.Path(blueprint).absolute()
+        self.transpilers = transpilers
+        self.core = core
+        self.settings = settings
+        self.output = output
+        self.context = context
+        self.junk: Junk = None
+        self.error: Exception = None
+
+    def __str__(self) -> str:
+        return f'build target {str(self.path)!r}'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    @property
+    def dependencies(self) -> set[pathlib.Path]:
+        dependencies = {self.path}
+        if self.junk is not None:
+            dependencies.update(self.junk.dependencies)
+        return dependencies
+
+    def transpile(self, cache: JunkCache = None) -> Junk:
+        self.junk = transpile(self.path, *self.transpilers, core=self.core, cache=cache, **self.settings)
+        return self.junk
+
+    def render(self) -> None:
+        if self.junk is None or self.error:
+            return
+        # Rendering writes the template's variables back into the context, so each render gets a fresh copy.
+        context = dict(self.context)
+        try:
+            if self.output is None:
+                self.junk.render(context)
+                return
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            with self.output.open('w') as writer:
+                self.junk.render_to(writer, context)
+        except Exception as error:
+            self.error = error
+
+
+from .blueprint import Blueprint
+from .cache import JunkCache
+from .junk import Junk
+from .transpiler import Transpiler, transpile
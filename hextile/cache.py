@@ -0,0 +1,236 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterable
+
+import functools
+import hashlib
+import marshal
+import os
+import pathlib
+import sys
+import types
+
+
+class JunkCache:
+    """
+    Persists transpiled junk objects on disk, so that transpiling the same blueprint with the same transpilers and
+    settings is reduced to a lookup.
+
+        >>> cache = JunkCache('/tmp/hextile')
+        >>> junk = transpile('/path/to/blueprint', cache=cache)
+
+    Entries are keyed by the blueprint's text, the transpilers (including the source of their modules) and the settings,
+    as well as the hextile version and the cache format; the files the junk depended on while transpiling (included
+    and extended blueprints, embedded assets, etc.) and the sources of the transpilers the blueprint activated itself
+    (e.g. with % transpilers) are hashed as well, and if any of them has changed, the entry is discarded. So are the
+    files written while transpiling (e.g. uploaded assets), so that if any of them is missing or has changed, the junk
+    is transpiled again and writes them. Entries that can't be read or decoded are treated as missing.
+    """
+
+    suffix = '.junk'
+    format_version = 5
+
+    def __init__(self, directory: str|pathlib.Path):
+        self.directory = pathlib.Path(directory).absolute()
+
+    def __str__(self) -> str:
+        return f'junk cache at {str(self.directory)!r}'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    @classmethod
+    def resolve(cls, config: str|pathlib.Path|JunkCache) -> JunkCache:
+        if isinstance(config, JunkCache):
+            return config
+        return cls(config)
+
+    def key(self, blueprint: Blueprint, transpilers: list[Transpiler]) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            sys.implementation.cache_tag,
+            __version__,
+            str(self.format_version),
+            blueprint.name,
+            str(blueprint.path),
+            text_fingerprint(blueprint),
+            *(fingerprint(transpiler) for transpiler in transpilers),
+            fingerprint(blueprint.settings),
+        ):
+            digest.update(part.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def load(self, key: str, blueprint: Blueprint, transpilers: list[Transpiler]) -> None|Junk:
+        path = self._path(key)
+        try:
+            data = marshal.loads(path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        # An entry written in another layout (e.g. by another version) may still be valid marshal data.
+        try:
+            if data['format'] != self.format_version:
+                return None
+            for dependency, dependency_hash in data['dependencies']:
+                if hash_file(dependency) != dependency_hash:
+                    return None
+            for source, source_hash in data['transpilers']:
+                if hash_module(source) != source_hash:
+                    return None
+            for output, output_hash in data['outputs']:
+                if hash_file(output) != output_hash:
+                    return None
+            junk = Junk(blueprint, transpilers)
+            junk._imports.update(data['imports'])
+            junk._definitions.update(data['definitions'])
+            junk._code_output.extend(JunkCode(code, origin, origins) for code, origin, origins in data['code_output'])
+            source_map = junk.source_map()
+            for key, code in data['templates'].items():
+                junk._templates[key] = Template(blueprint.name, code, source_map)
+            junk.dependencies.update(pathlib.Path(dependency) for dependency, _ in data['dependencies'])
+            junk.outputs.update(pathlib.Path(output) for output, _ in data['outputs'])
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+        return junk
+
+    def save(self, key: str, junk: Junk) -> None:
+        # The transpilers the blueprint activated itself aren't in the key, so their sources are checked on load.
+        sources = transpiler_sources(transpiler for transpiler in junk._states if transpiler not in junk.transpilers)
+        if sources is None:
+            return
+        junk.compile()
+        data = marshal.dumps(dict(
+            format = self.format_version,
+            dependencies = [(str(path), hash_file(path)) for path in sorted(junk.dependencies)],
+            transpilers = sources,
+            outputs = [(str(path), hash_file(path)) for path in sorted(junk.outputs)],
+            imports = sorted(junk._imports),
+            definitions = sorted(junk._definitions),
+            code_output = [
+                (str(line), getattr(line, 'origin', None), getattr(line, 'origins', None))
+                for line in junk._output()
+            ],
+            templates = {key: template.code for key, template in junk._templates.items()},
+        ))
+        # Imported here since it's slow to import, and only needed when saving.
+        import tempfile
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=self.suffix)
+        try:
+            with os.fdopen(fd, 'wb') as writer:
+                writer.write(data)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def clear(self) -> None:
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob(f'*{self.suffix}'):
+            path.unlink()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key}{self.suffix}'
+
+
+def fingerprint(value: Any) -> str:
+    if isinstance(value, Blueprint):
+        return f'Blueprint({value.name!r}, {text_fingerprint(value)}, {fingerprint(value.settings)})'
+    if isinstance(value, Transpiler):
+        transpile = value.transpile
+        code = ', '.join(code_fingerprint(function) for function in transpiler_functions(value))
+        return f'Transpiler({value.name!r}, {getattr(transpile, "__module__", None)}.{getattr(transpile, "__qualname__", None)}, [{code}])'
+    if isinstance(value, dict):
+        items = sorted((fingerprint(key), fingerprint(item)) for key, item in value.items())
+        return '{' + ', '.join(f'{key}: {item}' for key, item in items) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(fingerprint(item) for item in value) + ']'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ', '.join(sorted(fingerprint(item) for item in value)) + '}'
+    return repr(value)
+
+
+def transpiler_functions(transpiler: Transpiler) -> list[Callable[..., Any]]:
+    functions = [transpiler.transpile, transpiler._match, *transpiler.commands.values(), *transpiler.extensions]
+    return [function for function in functions if function is not None]
+
+
+def transpiler_sources(transpilers: Iterable[Transpiler]) -> None|list[tuple[str, str]]:
+    # Transpilers whose functions don't come from a module file (e.g. defined with exec) can't be checked.
+    sources: dict[str, str] = {}
+    for transpiler in transpilers:
+        for function in transpiler_functions(transpiler):
+            module = sys.modules.get(getattr(function, '__module__', None))
+            module_hash = module_fingerprint(module) if module is not None else None
+            if module_hash is None:
+                return None
+            sources[module.__file__] = module_hash
+    return sorted(sources.items())
+
+
+def code_fingerprint(function: Callable[..., Any]) -> str:
+    # The source of the function's module covers its helpers as well; functions without one fall back to their code.
+    module = sys.modules.get(getattr(function, '__module__', None))
+    module_hash = module_fingerprint(module) if module is not None else None
+    if module_hash is not None:
+        return f'sha256:{module_hash}'
+    code = getattr(function, '__code__', None)
+    if code is None:
+        return repr(function)
+    return 'code:' + hashlib.sha256(marshal.dumps(code)).hexdigest()
+
+
+def module_fingerprint(module: types.ModuleType) -> None|str:
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+    return hash_module(path)
+
+
+def hash_module(path: str) -> None|str:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return hash_source(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.cache
+def hash_source(path: str, mtime: int, size: int) -> None|str:
+    # Keyed by the file's modification time and size as well, so that a module is only read again when it changes.
+    return hash_file(path)
+
+
+def text_fingerprint(blueprint: Blueprint) -> str:
+    # Blueprints that don't retain their text are identified by the hash of their file instead of reading it again.
+    if blueprint.has_text:
+        return repr(blueprint.text)
+    return f'sha256:{hash_file(blueprint.path)}'
+
+
+def hash_file(path: str|pathlib.Path) -> None|str:
+    path = pathlib.Path(path)
+    if path.is_dir():
+        # Directories may be listed and their files read (e.g. components bundled from them), so they change when any
+        # entry in them is added, removed or modified.
+        digest = hashlib.sha256()
+        for directory, directories, files in os.walk(path):
+            directories.sort()
+            for name in sorted(files):
+                entry = pathlib.Path(directory, name)
+                digest.update(f'{entry.relative_to(path).as_posix()}\0{hash_file(entry)}\0'.encode())
+            for name in directories:
+                digest.update(f'{pathlib.Path(directory, name).relative_to(path).as_posix()}/\0'.encode())
+        return digest.hexdigest()
+    try:
+        with pathlib.Path(path).open('rb') as reader:
+            return hashlib.file_digest(reader, 'sha256').hexdigest()
+    except OSError:
+        return None
+
+
+from . import __version__
+from .blueprint import Blueprint
+from .junk import Junk, JunkCode
+from .template import Template
+from .transpiler import Transpiler
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Any, Callable, ContextManager, TypeVar
+from typing import Any, BinaryIO, Callable, ContextManager, Iterable, Iterator, TextIO, TypeVar
 
+import ast
 import contextlib
+import pathlib
 
 
 T = TypeVar('T')
@@ -16,9 +18,13 @@ class Junk:
         pass
 
     EMIT = '__emit__'
+    EMIT_BLOCK = '__emit_block__'
     CALL = '__call__'
     CAPTURE = '__capture__'
 
+    optimize = False
+    backend = 'module'
+
     default_interpolation = '{', '}'
     interpolations: dict[str, tuple[str, str]] = dict(
         css = ('<', '>'),
@@ -26,16 +32,18 @@ class Junk:
         json = ('<', '>'),
     )
 
-    def __init__(self, blueprint: Blueprint, transpilers: list[Transpiler]):
+    def __init__(
+            self,
+            blueprint: Blueprint,
+            transpilers: list[Transpiler],
+            tracer: Callable[[str, str, float, float], Any] = None,
+    ):
         self.blueprint = blueprint
         self.transpilers = transpilers
+        self.stats = TranspileStats(tracer)
         self.active_transpilers: list[Transpiler] = []
-        self.builtins = {
-            self.EMIT: self._render_emit,
-            self.CALL: self._render_call,
-            self.CAPTURE: self._render_capture,
-            self.StopTranspilation.__name__: self.StopTranspilation,
-        }
+        self._dispatch = TranspilerDispatch([])
+        self._dispatches: dict[tuple[Transpiler, ...], TranspilerDispatch] = {}
         self._lines: list[Line] = []
         self._transpilers: list[Transpiler] = []
         self._states: dict[Transpiler, TranspilerState] = {}
@@ -46,8 +54,9 @@ class Junk:
         self._text_indent: int = None
         self._code_output: list[str] = []
         self._on_complete: dict[Transpiler, Callable[[Junk], None]] = {}
-        self._render_indent = 0
-        self._render_output: list[str] = []
+        self._templates: dict[tuple[bool, str], Template] = {}
+        self.dependencies: set[pathlib.Path] = set()
+        self.outputs: set[pathlib.Path] = set()
     
     def __str__(self) -> str:
         return f'junk of {self.blueprint} with transpilers {", ".join(transpiler.name for transpiler in self.transpilers)}'
@@ -76,15 +85,12 @@ class Junk:
         self._assert_transpiler()
         return self._states[self.transpiler]
     
-    def to_string(self) -> str:
-        output: list[str] = []
-        for name in sorted(self._imports):
-            output.append(f'import {name}')
-        output.extend(self._definitions)
-        for line in self._code_output:
-            if isinstance(line, JunkPlaceholder):
-                continue
-            output.append(line)
+    def to_string(self, optimize: bool = False) -> str:
+        if optimize:
+            return ast.unparse(optimize_tree(ast.parse(self.to_string(), self.blueprint.name)))
+        output = self._preamble()
+        for line in self._output():
+            output.append(str(line))
         return '\n'.join(output)
     
     def transpile(
@@ -96,30 +102,71 @@ class Junk:
             blueprint = self.blueprint
         if not transpilers and not self.active_transpilers:
             transpilers = self.transpilers
-        self._code_output.clear()
-        self._interpolations = [self.default_interpolation]
-        if transpilers:
-            self.set_active_transpilers(transpilers)
-        with contextlib.suppress(self.StopTranspilation):
-            self._run_transpilers(blueprint.lines)
-        on_complete = self._on_complete.copy()
-        self._on_complete.clear()
-        for transpiler, callback in reversed(on_complete.items()):
-            with self._set_transpiler(transpiler):
-                callback(self)
-        if transpilers:
-            self.active_transpilers.clear()
+        start = self.stats.start()
+        try:
+            self._code_output.clear()
+            self._templates.clear()
+            self._interpolations = [self.default_interpolation]
+            if transpilers:
+                self.set_active_transpilers(transpilers)
+            with contextlib.suppress(self.StopTranspilation):
+                self._run_transpilers(blueprint.lines)
+            on_complete = self._on_complete.copy()
+            self._on_complete.clear()
+            for transpiler, callback in reversed(on_complete.items()):
+                with self._set_transpiler(transpiler):
+                    callback(self)
+            if transpilers:
+                self.set_active_transpilers([])
+        finally:
+            self.stats.stop('junk', 'transpile', start)
     
     def render(self, context: dict[str, Any] = None, /, **more_context: Any) -> str:
-        if context is None:
-            context = {}
-            context.update(more_context)
-        context.update(self.builtins)
-        text = self.to_string()
-        code = compile(text, self.blueprint.name, 'exec')
-        self._render_output.clear()
-        exec(code, context)
-        return '\n'.join(self._render_output)
+        return self.compile().render(context, **more_context)
+
+    def render_to(self, fp: TextIO|BinaryIO, context: dict[str, Any] = None, /, **more_context: Any) -> None:
+        self.compile().render_to(fp, context, **more_context)
+
+    def iter_render(self, context: dict[str, Any] = None, /, **more_context: Any) -> Iterator[str]:
+        return self.compile().iter_render(context, **more_context)
+
+    def render_many(
+            self,
+            contexts: Iterable[dict[str, Any]],
+            workers: int = None,
+            chunk_size: int = 1,
+    ) -> Iterator[str]:
+        return self.compile().render_many(contexts, workers, chunk_size)
+
+    def profile(self) -> Profile:
+        return self.compile().profile()
+
+    def compile(self, optimize: bool = None, backend: str = None) -> Template:
+        if optimize is None:
+            optimize = self.optimize
+        if backend is None:
+            backend = self.backend
+        if backend not in backends:
+            raise ValueError(f'backend {backend!r} does not exist (expected one of: {", ".join(backends)})')
+        key = optimize, backend
+        if key not in self._templates:
+            tree = ast.parse(self.to_string(), self.blueprint.name)
+            if optimize:
+                tree = optimize_tree(tree)
+            preamble_size = self._preamble_size()
+            code = backends[backend](tree, self.blueprint.name, preamble_size)
+            self._templates[key] = Template(self.blueprint.name, code, self.source_map())
+        return self._templates[key]
+
+    def source_map(self) -> SourceMap:
+        origins: list[None|tuple[str, int]] = [None] * self._preamble_size()
+        blocks: dict[int, list[tuple[str, int]]] = {}
+        for line in self._output():
+            origins.append(getattr(line, 'origin', None))
+            block = getattr(line, 'origins', None)
+            if block and len(block) > 1:
+                blocks[len(origins)] = block
+        return SourceMap(origins, blocks)
 
     def error(self, message: str) -> TranspilationError:
         if not self.line:
@@ -138,6 +185,10 @@ class Junk:
                 with self._set_transpiler(transpiler):
                     self._states[transpiler] = transpiler.state(self)
         self.active_transpilers = transpilers
+        key = tuple(transpilers)
+        if key not in self._dispatches:
+            self._dispatches[key] = TranspilerDispatch(transpilers)
+        self._dispatch = self._dispatches[key]
     
     @contextlib.contextmanager
     def suspend_transpiler(self) -> ContextManager[None]:
@@ -147,7 +198,7 @@ class Junk:
         if transpiler not in transpilers:
             yield
             return
-        self.set_active_transpilers([transpiler for transpiler in transpilers if transpiler is not self.current_transpiler])
+        self.set_active_transpilers([other for other in transpilers if other is not transpiler])
         try:
             yield
         finally:
@@ -174,17 +225,34 @@ class Junk:
         with self.use_interpolation(*interpolation):
             yield
 
+    @contextlib.contextmanager
+    def measure(self, kind: str, name: str) -> ContextManager[None]:
+        start = self.stats.start()
+        try:
+            yield
+        finally:
+            self.stats.stop(kind, name, start)
+
     def interpolate(self, text: str, as_string: bool = False) -> str:
+        start = self.stats.start()
+        try:
+            return self._interpolate(text, as_string)
+        finally:
+            self.stats.stop('junk', 'interpolate', start)
+
+    def _interpolate(self, text: str, as_string: bool) -> str:
         words: list[str] = []
         has_code = False
-        for splinter in splinterpolate(*self.interpolation, text):
+        extended = [transpiler for transpiler in self.active_transpilers if transpiler.extensions]
+        # Compiled splinters are shared between identical lines, so extensions get a copy to rewrite.
+        for splinter in compile_splinters(*self.interpolation, text):
             if not splinter.is_code:
                 words.append(repr(splinter.text))
                 continue
             has_code = True
-            splinter.compile()
-            for transpiler in self.active_transpilers:
-                if transpiler.extensions:
+            if extended:
+                splinter = splinter.copy()
+                for transpiler in extended:
                     with self._set_transpiler(transpiler):
                         for extension in transpiler.extensions:
                             extension(self, splinter)
@@ -214,6 +282,19 @@ class Junk:
         except Exception as error:
             raise self.error(str(error))
     
+    def load(self, config: str|pathlib.Path|Blueprint, **settings: Any) -> Blueprint:
+        blueprint = Blueprint.resolve(config, self.blueprint.path.parent, **settings)
+        if not isinstance(config, Blueprint) and not (isinstance(config, str) and '\n' in config):
+            self.add_dependency(blueprint.path)
+        return blueprint
+
+    def add_dependency(self, path: pathlib.Path) -> None:
+        self.dependencies.add(pathlib.Path(path).absolute())
+
+    def add_output(self, path: pathlib.Path) -> None:
+        # Files written while transpiling (e.g. uploaded assets), which the rendered output may refer to.
+        self.outputs.add(pathlib.Path(path).absolute())
+
     def add_imports(self, *modules: str) -> None:
         self._imports.update(modules)
 
@@ -231,7 +312,10 @@ class Junk:
         return callback   
 
     def run_transpiler_command(self) -> None:
-        self.evaluate(self.line.content, **self.state.commands)
+        state = self.state
+        if len(state.commands) != len(self.transpiler.commands):
+            state.bind_commands(self)
+        self.evaluate(self.line.content, **state.commands)
 
     def recurse(self, lines: list[Line] = None, indent: int = 0) -> None:
         if lines is None:
@@ -245,8 +329,9 @@ class Junk:
 
     def emit_code(self, code: str) -> None:
         whitespace = ' ' * 4 * self._code_indent
+        origin = self._origin()
         for line in trim(code):
-            self._code_output.append(whitespace + line)
+            self._code_output.append(JunkCode(whitespace + line, origin))
     
     @contextlib.contextmanager
     def try_emit_code(self) -> ContextManager[None]:
@@ -273,14 +358,18 @@ class Junk:
         for line in trim(text):
             if not line:
                 continue
-            if interpolate:
-                words = self.interpolate(line)
-            else:
-                words = repr(line)
+            if not interpolate:
+                self._emit_static_text(' ' * indent + line)
+                continue
+            splinters = compile_splinters(*self.interpolation, line)
+            if not any(splinter.is_code for splinter in splinters):
+                self._emit_static_text(' ' * indent + ''.join(splinter.text for splinter in splinters))
+                continue
+            words = self.interpolate(line)
             self.emit_code(f'{self.EMIT}({indent:<3}, {" " * (indent - 4 * self._code_indent)}{words})')
    
     def emit_empty_line(self) -> None:
-        self.emit_code(f'{self.EMIT}(0, "")')
+        self._emit_static_text('')
 
     @contextlib.contextmanager
     def capture_emit(self, into: list[str], indent: int = None) -> ContextManager[None]:
@@ -305,6 +394,42 @@ class Junk:
             else:
                 self.emit_code(f"{name} = '\\n'.join(_)")   
 
+    def _origin(self) -> None|tuple[str, int]:
+        if not self.line:
+            return None
+        return self.line.name, self.line.number
+
+    def _output(self, lines: list[str|JunkCode|JunkPlaceholder] = None) -> Iterator[str|JunkCode]:
+        if lines is None:
+            lines = self._code_output
+        for line in lines:
+            if isinstance(line, JunkPlaceholder):
+                yield from self._output(line.lines)
+            else:
+                yield line
+
+    def _preamble(self) -> list[str]:
+        preamble: list[str] = []
+        for name in sorted(self._imports):
+            preamble.append(f'import {name}')
+        preamble.extend(self._definitions)
+        return preamble
+
+    def _preamble_size(self) -> int:
+        preamble = self._preamble()
+        if not preamble:
+            return 0
+        return '\n'.join(preamble).count('\n') + 1
+
+    def _emit_static_text(self, text: str) -> None:
+        whitespace = ' ' * 4 * self._code_indent
+        last_emit = self._code_output[-1] if self._code_output else None
+        if isinstance(last_emit, JunkStaticText) and last_emit.whitespace == whitespace:
+            last_emit.lines.append(text)
+            last_emit.origins.append(self._origin())
+        else:
+            self._code_output.append(JunkStaticText(whitespace, text, origin=self._origin()))
+
     def _assert_line(self) -> None:
         if not self.line:
             raise RuntimeError(f'{self} has no current line')
@@ -338,51 +463,88 @@ class Junk:
             self._interpolations.pop()
     
     def _run_transpilers(self, lines: list[Line]) -> None:
-        for line in lines:
-            with self._set_line(line):
-                for transpiler in self.active_transpilers:
-                    if not transpiler.matches(self):
-                        continue
-                    with self._set_transpiler(transpiler):
-                        transpiler.transpile(self)
-                    break
-                else:
-                    raise self.error(f'no transpiler matched (tried: {", ".join(transpiler.name for transpiler in self.active_transpilers)})')
-    
-    def _render_emit(self, indent: int, *output: Any) -> None:
-        whitespace = ' ' * (indent + self._render_indent)
-        self._render_output.append(whitespace + ''.join(map(str, output)))
-
-    def _render_call(self, indent: int, function: Callable, *args: Any, **kwargs: Any) -> None:
-        self._render_indent += indent
+        stats = self.stats
+        start = stats.start()
         try:
-            function(*args, **kwargs)
+            for line in lines:
+                stats.lines += 1
+                line = line.view()
+                with self._set_line(line):
+                    self._run_transpiler(line)
         finally:
-            self._render_indent -= indent
+            stats.stop('junk', 'run_transpilers', start)
+
+    def _run_transpiler(self, line: Line) -> None:
+        dispatch = self._dispatch
+        first = line.content[:1]
+        candidates = dispatch.candidates(first)
+        position = 0
+        while position < len(candidates):
+            index = candidates[position]
+            position += 1
+            transpiler = dispatch.transpilers[index]
+            if transpiler.matches(self):
+                start = self.stats.start()
+                try:
+                    with self._set_transpiler(transpiler):
+                        transpiler.transpile(self)
+                finally:
+                    self.stats.stop('transpiler', transpiler.name, start)
+                return
+            # Escaped prefixes are rewritten in place, so the remaining candidates may have changed.
+            if line.content[:1] != first:
+                first = line.content[:1]
+                candidates = dispatch.candidates(first, after=index)
+                position = 0
+        raise self.error(f'no transpiler matched (tried: {", ".join(transpiler.name for transpiler in self.active_transpilers)})')
 
-    @contextlib.contextmanager
-    def _render_capture(self) -> ContextManager[list[str]]:
-        output = self._render_output
-        self._render_output = []
-        try:
-            yield self._render_output
-        except self.StopTranspilation:
-            pass
-        finally:
-            self._render_output = output
-        
 
 class JunkPlaceholder:
 
     def __init__(self, junk: Junk, indent: int):
         self.junk = junk
         self.indent = indent
+        self.lines: list[str|JunkCode|JunkPlaceholder] = []
     
     def inject(self, lines: list[str]) -> None:
-        index = self.junk._code_output.index(self)
-        self.junk._code_output[index:index] = lines
+        # The lines are kept in the placeholder and expanded in its place on output, rather than spliced into the
+        # code output, which would cost a search and a copy of the whole output per injection.
+        self.lines.extend(lines)
     
 
+class JunkCode:
+
+    def __init__(self, code: str, origin: None|tuple[str, int] = None, origins: list[tuple[str, int]] = None):
+        self.code = code
+        self.origin = origin
+        self.origins = origins
+
+    def __str__(self) -> str:
+        return self.code
+
+
+class JunkStaticText:
+
+    def __init__(self, whitespace: str, *lines: str, origin: None|tuple[str, int] = None):
+        self.whitespace = whitespace
+        self.lines = list(lines)
+        self.origins = [origin] * len(lines)
+
+    @property
+    def origin(self) -> None|tuple[str, int]:
+        return self.origins[0] if self.origins else None
+
+    def __str__(self) -> str:
+        text = '\n'.join(self.lines)
+        return f'{self.whitespace}{Junk.EMIT_BLOCK}({text!r})'
+
+
+from .backends import backends
 from .blueprint import Blueprint, Line, trim
-from .splinterpolate import splinterpolate
-from .transpiler import Transpiler, TranspilerState
\ No newline at end of file
+from .optimizer import optimize_tree
+from .profiler import Profile
+from .sourcemap import SourceMap
+from .stats import TranspileStats
+from .splinterpolate import compile_splinters
+from .template import Template
+from .transpiler import Transpiler, TranspilerDispatch, TranspilerState
\ No newline at end of file
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import ast
+import operator
+
+
+max_folded_size = 4096
+folded_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+}
+
+
+def optimize_tree(tree: ast.Module) -> ast.Module:
+    """
+    Applies peephole optimizations to the code generated by a junk object:
+
+    - Folds arithmetic and concatenation of literals, and str() of string literals.
+    - Replaces ''.join(map(str, (...))) with f-strings.
+    - Merges the arguments of __emit__ calls into one f-string or literal, and turns literal emits into
+      __emit_block__ calls, merging consecutive ones.
+    - Drops try statements whose body does nothing.
+    - Binds the emitting builtins to keyword-only parameters of functions that use them, so they're looked up as
+      locals rather than globals.
+
+    Line numbers are preserved, so tracebacks still point at the same generated lines.
+    """
+    tree = Optimizer().visit(tree)
+    return ast.fix_missing_locations(tree)
+
+
+class Optimizer(ast.NodeTransformer):
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        node = super().generic_visit(node)
+        for field in ('body', 'orelse', 'finalbody'):
+            statements = getattr(node, field, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                statements = self._optimize_statements(statements)
+                if not statements and field == 'body':
+                    statements = [ast.Pass()]
+                setattr(node, field, statements)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        node = self.generic_visit(node)
+        fold = folded_operators.get(type(node.op))
+        if not fold or not is_constant(node.left, int, float, str) or not is_constant(node.right, int, float, str):
+            return node
+        left, right = node.left.value, node.right.value
+        if isinstance(node.op, ast.Mult) and (isinstance(left, str) or isinstance(right, str)):
+            text, count = (left, right) if isinstance(left, str) else (right, left)
+            if not isinstance(count, int) or len(text) * count > max_folded_size:
+                return node
+        try:
+            value = fold(left, right)
+        except Exception:
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        node = self.generic_visit(node)
+        if node.keywords:
+            return node
+        if is_name(node.func, 'str') and len(node.args) == 1:
+            argument = node.args[0]
+            if is_constant(argument, str) or isinstance(argument, ast.JoinedStr):
+                return argument
+        if is_join(node):
+            return ast.copy_location(join(node.args[0].args[1].elts), node)
+        if is_name(node.func, Junk.EMIT) and len(node.args) > 1 and not any(isinstance(arg, ast.Starred) for arg in node.args):
+            indent, *words = node.args
+            if len(words) > 1 or is_constant(words[0], str):
+                value = join(words)
+                if is_constant(indent, int) and is_constant(value, str) and '\n' not in value.value:
+                    return ast.copy_location(ast.Call(
+                        func = ast.Name(Junk.EMIT_BLOCK, ast.Load()),
+                        args = [ast.Constant(' ' * indent.value + value.value)],
+                        keywords = [],
+                    ), node)
+                node.args = [indent, value]
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        node = self.generic_visit(node)
+        arguments = node.args
+        parameters = {arg.arg for arg in [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]}
+        if arguments.vararg:
+            parameters.add(arguments.vararg.arg)
+        if arguments.kwarg:
+            parameters.add(arguments.kwarg.arg)
+        used = {
+            child.id for child in ast.walk(node)
+            if isinstance(child, ast.Name) and child.id in (Junk.EMIT, Junk.EMIT_BLOCK, Junk.CALL, Junk.CAPTURE)
+        }
+        for name in sorted(used - parameters):
+            arguments.kwonlyargs.append(ast.arg(name))
+            arguments.kw_defaults.append(ast.Name(name, ast.Load()))
+        return node
+
+    def _optimize_statements(self, statements: list[ast.stmt]) -> list[ast.stmt]:
+        optimized: list[ast.stmt] = []
+        for statement in statements:
+            if isinstance(statement, ast.Try) and not statement.finalbody and all(isinstance(child, ast.Pass) for child in statement.body):
+                optimized.extend(statement.orelse)
+                continue
+            if optimized and is_block(statement) and is_block(optimized[-1]):
+                previous = optimized[-1].value.args[0]
+                previous.value = f'{previous.value}\n{statement.value.args[0].value}'
+                continue
+            optimized.append(statement)
+        return optimized
+
+
+def is_constant(node: ast.AST, *types: type) -> bool:
+    return isinstance(node, ast.Constant) and type(node.value) in types
+
+
+def is_name(node: ast.AST, name: str) -> bool:
+    return isinstance(node, ast.Name) and node.id == name
+
+
+def is_join(node: ast.Call) -> bool:
+    # ''.join(map(str, (...)))
+    return (
+        isinstance(node.func, ast.Attribute)
+        and node.func.attr == 'join'
+        and is_constant(node.func.value, str)
+        and node.func.value.value == ''
+        and len(node.args) == 1
+        and isinstance(node.args[0], ast.Call)
+        and is_name(node.args[0].func, 'map')
+        and len(node.args[0].args) == 2
+        and is_name(node.args[0].args[0], 'str')
+        and isinstance(node.args[0].args[1], ast.Tuple)
+        and not any(isinstance(element, ast.Starred) for element in node.args[0].args[1].elts)
+    )
+
+
+def is_block(node: ast.stmt) -> bool:
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Call)
+        and is_name(node.value.func, Junk.EMIT_BLOCK)
+        and len(node.value.args) == 1
+        and is_constant(node.value.args[0], str)
+    )
+
+
+def join(nodes: list[ast.expr]) -> ast.expr:
+    values: list[ast.expr] = []
+    for node in nodes:
+        if isinstance(node, ast.JoinedStr):
+            parts = node.values
+        elif is_constant(node, str):
+            parts = [node]
+        else:
+            # The s conversion makes the f-string equivalent to str(), rather than format().
+            parts = [ast.FormattedValue(node, ord('s'), None)]
+        for part in parts:
+            if is_constant(part, str) and values and is_constant(values[-1], str):
+                values[-1] = ast.Constant(values[-1].value + part.value)
+            else:
+                values.append(part)
+    if not values:
+        return ast.Constant('')
+    if len(values) == 1 and is_constant(values[0], str):
+        return values[0]
+    return ast.JoinedStr(values)
+
+
+from .junk import Junk
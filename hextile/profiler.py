@@ -0,0 +1,186 @@
+from __future__ import annotations
+from types import FrameType, TracebackType
+from typing import Any, Callable, Iterator
+
+import contextlib
+import sys
+import threading
+import time
+
+
+profiling = threading.local()
+
+
+class Profile:
+    """
+    Profiles the renders of a template in the current thread (and the threads iter_render starts from it),
+    attributing wall time, hits and emitted bytes (in the template's encoding) to the blueprint lines the code was
+    transpiled from, and wall time and calls to the !.functions it defines.
+
+        >>> with template.profile() as profile:
+        ...     template.render(n=1000)
+        >>> print(profile.table(limit=10))
+
+    The time of a line excludes the time of the template lines it calls into, but includes everything else it does
+    (e.g. calling into other modules); the time of a function includes everything. Consecutive static lines are
+    emitted at once, so each of them is hit and charged with its own bytes, but their time is charged to the first.
+    A profile keeps one position at a time, so it shouldn't be used by several renders concurrently.
+    """
+
+    function_prefix = '__function_'
+    function_suffix = '__'
+
+    def __init__(self, template: Template):
+        self.template = template
+        self.lines: dict[tuple[str, int], LineStats] = {}
+        self.functions: dict[str, FunctionStats] = {}
+        self._origin: None|tuple[str, int] = None
+        self._lineno = 0
+        self._stack: list[tuple[None|tuple[str, int], int, None|str, float]] = []
+        self._last = 0.0
+        self._previous_trace: Callable = None
+        self._previous_profile: None|Profile = None
+
+    def __str__(self) -> str:
+        return f'profile of {self.template}'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def __enter__(self) -> Profile:
+        self._previous_profile = getattr(profiling, 'profile', None)
+        self._previous_trace = sys.gettrace()
+        profiling.profile = self
+        self._last = time.perf_counter()
+        sys.settrace(self._trace)
+        return self
+
+    def __exit__(self, exception_type: type[BaseException], exception: BaseException, traceback: TracebackType) -> None:
+        sys.settrace(self._previous_trace)
+        profiling.profile = self._previous_profile
+
+    @contextlib.contextmanager
+    def thread(self) -> Iterator[None]:
+        """
+        Profiles the current thread as well, while it renders on behalf of the profiled one.
+        """
+        previous_profile = getattr(profiling, 'profile', None)
+        previous_trace = sys.gettrace()
+        profiling.profile = self
+        self._last = time.perf_counter()
+        sys.settrace(self._trace)
+        try:
+            yield
+        finally:
+            sys.settrace(previous_trace)
+            profiling.profile = previous_profile
+
+    def table(self, limit: int = None) -> str:
+        lines = sorted(self.lines.items(), key=lambda item: item[1].time, reverse=True)[:limit]
+        functions = sorted(self.functions.items(), key=lambda item: item[1].time, reverse=True)[:limit]
+        total = sum(stats.time for stats in self.lines.values()) or 1
+        width = max([len('line'), len('function'), *(len(f'{name}:{number}') for (name, number), _ in lines), *(len(name) for name, _ in functions)])
+        output = [f'{"line":<{width}} {"hits":>10} {"time (ms)":>12} {"time %":>8} {"bytes":>12}']
+        for (name, number), stats in lines:
+            output.append(f'{f"{name}:{number}":<{width}} {stats.hits:>10} {stats.time * 1000:>12.3f} {stats.time / total * 100:>7.1f}% {stats.emitted:>12}')
+        if functions:
+            output.append('')
+            output.append(f'{"function":<{width}} {"calls":>10} {"time (ms)":>12}')
+            for name, stats in functions:
+                output.append(f'{name:<{width}} {stats.calls:>10} {stats.time * 1000:>12.3f}')
+        return '\n'.join(output)
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            template = self.template.name,
+            lines = [
+                dict(name=name, number=number, hits=stats.hits, time=stats.time, emitted=stats.emitted)
+                for (name, number), stats in sorted(self.lines.items(), key=lambda item: item[1].time, reverse=True)
+            ],
+            functions = [
+                dict(name=name, calls=stats.calls, time=stats.time)
+                for name, stats in sorted(self.functions.items(), key=lambda item: item[1].time, reverse=True)
+            ],
+        )
+
+    def record_emit(self, size: int) -> None:
+        if self._origin:
+            self._line(self._origin).emitted += size
+
+    def record_emit_block(self, sizes: list[int]) -> None:
+        origins = self.template.source_map.lookup_block(self._lineno)
+        if not origins or len(origins) != len(sizes):
+            self.record_emit(sum(sizes))
+            return
+        # The first line was hit when the block was reached.
+        for index, (origin, size) in enumerate(zip(origins, sizes)):
+            stats = self._line(origin)
+            if index:
+                stats.hits += 1
+            stats.emitted += size
+
+    def _trace(self, frame: FrameType, event: str, argument: Any) -> None|Callable:
+        if event != 'call' or frame.f_code not in self.template.code_objects:
+            return None
+        now = time.perf_counter()
+        self._charge(now)
+        name = frame.f_code.co_name
+        if name.startswith(self.function_prefix) and name.endswith(self.function_suffix):
+            function = name[len(self.function_prefix):-len(self.function_suffix)]
+        else:
+            function = None
+        self._stack.append((self._origin, self._lineno, function, now))
+        self._last = time.perf_counter()
+        return self._trace_frame
+
+    def _trace_frame(self, frame: FrameType, event: str, argument: Any) -> Callable:
+        now = time.perf_counter()
+        self._charge(now)
+        if event == 'line':
+            self._lineno = frame.f_lineno
+            self._origin = self.template.source_map.lookup(frame.f_lineno)
+            if self._origin:
+                self._line(self._origin).hits += 1
+        elif event == 'return' and self._stack:
+            self._origin, self._lineno, function, start = self._stack.pop()
+            if function:
+                stats = self.functions.setdefault(function, FunctionStats())
+                stats.calls += 1
+                stats.time += now - start
+        self._last = time.perf_counter()
+        return self._trace_frame
+
+    def _charge(self, now: float) -> None:
+        if self._origin:
+            self._line(self._origin).time += now - self._last
+
+    def _line(self, origin: tuple[str, int]) -> LineStats:
+        stats = self.lines.get(origin)
+        if stats is None:
+            stats = self.lines[origin] = LineStats()
+        return stats
+
+
+class LineStats:
+
+    def __init__(self):
+        self.hits = 0
+        self.time = 0.0
+        self.emitted = 0
+
+
+class FunctionStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+
+
+def current_profile(template: Template) -> None|Profile:
+    profile = getattr(profiling, 'profile', None)
+    if profile is None or profile.template is not template:
+        return None
+    return profile
+
+
+from .template import Template
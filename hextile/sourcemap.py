@@ -0,0 +1,61 @@
+from __future__ import annotations
+from types import CodeType, TracebackType
+
+
+class SourceMap:
+    """
+    Maps the lines of the code generated by a junk object back to the blueprint lines they were transpiled from
+    (across included and extended blueprints), so that tracebacks and profiles can refer to the blueprint.
+
+        >>> template = transpile('''
+        ... !for i in range(n):
+        ...     line {1 / i}
+        ... ''').compile()
+        >>> template.source_map.lookup(2)
+        ('example:1', 2)
+    """
+
+    def __init__(self, origins: list[None|tuple[str, int]], blocks: dict[int, list[tuple[str, int]]] = None):
+        if blocks is None:
+            blocks = {}
+        self.origins = origins
+        # The lines that emit several static lines at once (see Junk._emit_static_text) map to the origin of each.
+        self.blocks = blocks
+
+    def __str__(self) -> str:
+        return f'source map of {len(self.origins)} lines'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def lookup(self, lineno: int) -> None|tuple[str, int]:
+        if 1 <= lineno <= len(self.origins):
+            return self.origins[lineno - 1]
+        return None
+
+    def lookup_block(self, lineno: int) -> None|list[tuple[str, int]]:
+        return self.blocks.get(lineno)
+
+    def to_dict(self) -> dict[int, tuple[str, int]]:
+        return {lineno: origin for lineno, origin in enumerate(self.origins, 1) if origin}
+
+    def locate(self, traceback: TracebackType, code_objects: set[CodeType]) -> list[tuple[str, int]]:
+        origins = []
+        while traceback:
+            code = traceback.tb_frame.f_code
+            # The module frame that just calls the render function (see backends.compile_function) says nothing new.
+            is_call = code.co_name == '<module>' and traceback.tb_next and traceback.tb_next.tb_frame.f_code in code_objects
+            if code in code_objects and not is_call:
+                origin = self.lookup(traceback.tb_lineno)
+                if origin:
+                    origins.append(origin)
+            traceback = traceback.tb_next
+        return origins
+
+
+def get_code_objects(code: CodeType) -> set[CodeType]:
+    code_objects = {code}
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            code_objects.update(get_code_objects(const))
+    return code_objects
@@ -2,6 +2,9 @@ from __future__ import annotations
 from types import CodeType
 from typing import Any, Callable, Iterator
 
+import functools
+import re
+
 
 quotes = "'", '"'
 escape = '\\'
@@ -21,72 +24,98 @@ def splinterpolate(
         yield Splinter(string)
         return
     length, start_length, end_length = len(string), len(start_token), len(end_token)
+    tokens_regex = get_tokens_regex(start_token, end_token)
     splinter = []
     cursor = 0
     while cursor < length:
-        if string[cursor:cursor + start_length] == start_token:
-            if string[cursor + start_length:cursor + 2*start_length] == start_token:
-                splinter.extend(start_token)
-                cursor += 2 * start_length
+        match = tokens_regex.search(string, cursor)
+        if not match:
+            splinter.append(string[cursor:])
+            break
+        position = match.start()
+        if position > cursor:
+            splinter.append(string[cursor:position])
+        if match.lastindex == 1:
+            if string.startswith(start_token, position + start_length):
+                splinter.append(start_token)
+                cursor = position + 2 * start_length
             else:
-                start = cursor + start_length
+                start = position + start_length
                 end = skip_expression(start_token, end_token, string, start)
                 expression = string[start:end].strip()
                 if splinter:
                     yield Splinter(''.join(splinter))
                     splinter.clear()
                 yield Splinter(expression, is_code=True)
-                end += end_length
-                cursor = end
-        elif string[cursor:cursor + end_length] == end_token:
-            if string[cursor + end_length:cursor + 2*end_length] == end_token:
-                splinter.extend(end_token)
-                cursor += 2 * end_length
-            else:
-                raise ValueError(f'failed to parse {string!r}: unmatched {end_token!r} at offset {cursor}')
+                cursor = end + end_length
         else:
-            splinter.append(string[cursor])
-            cursor += 1
+            if string.startswith(end_token, position + end_length):
+                splinter.append(end_token)
+                cursor = position + 2 * end_length
+            else:
+                raise ValueError(f'failed to parse {string!r}: unmatched {end_token!r} at offset {position}')
     if splinter:
         yield Splinter(''.join(splinter))
     
 
 def skip_expression(start_token: str, end_token: str, string: str, cursor: int) -> int:
-    length, start_length, end_length = len(string), len(start_token), len(end_token)
+    start_length, end_length = len(start_token), len(end_token)
+    expression_regex = get_expression_regex(start_token, end_token)
     depth = 1
-    while cursor < length:
-        if string[cursor:cursor + start_length] == start_token:
+    while True:
+        match = expression_regex.search(string, cursor)
+        if not match:
+            raise ValueError(f'failed to parse {string!r}: unmatched {start_token!r} at offset {len(string)}')
+        cursor = match.start()
+        if match.lastindex == 1:
             depth += 1
             cursor += start_length
-        elif string[cursor:cursor + end_length] == end_token:
+        elif match.lastindex == 2:
             depth -= 1
             if depth == 0:
                 break
             cursor += end_length
-        elif string[cursor] in quotes:
-            cursor = skip_string(string, cursor)
         else:
-            cursor += 1
-    else:
-        raise ValueError(f'failed to parse {string!r}: unmatched {start_token!r} at offset {cursor}')
+            cursor = skip_string(string, cursor)
     return cursor
 
 
 def skip_string(string: str, cursor: int) -> int:
     length = len(string)
-    quote = string[cursor]
+    quote_regex = quote_regexes[string[cursor]]
     cursor += 1
     while cursor < length:
-        if string[cursor] == quote:
-            cursor += 1
+        match = quote_regex.search(string, cursor)
+        if not match:
+            cursor = length
             break
-        if string[cursor] == escape:
-            cursor += 2
-        else:
-            cursor += 1
-    else:
-        raise ValueError(f'failed to parse {string!r}: unterminated quote at offset {cursor}')
-    return cursor
+        cursor = match.start()
+        if string[cursor] != escape:
+            return cursor + 1
+        cursor += 2
+    raise ValueError(f'failed to parse {string!r}: unterminated quote at offset {cursor}')
+
+
+@functools.lru_cache(maxsize=16 * 1024)
+def compile_splinters(start_token: str, end_token: str, string: str) -> tuple[Splinter, ...]:
+    splinters = tuple(splinterpolate(start_token, end_token, string))
+    for splinter in splinters:
+        splinter.compile()
+    return splinters
+
+
+@functools.lru_cache
+def get_tokens_regex(start_token: str, end_token: str) -> re.Pattern:
+    return re.compile(f'({re.escape(start_token)})|({re.escape(end_token)})')
+
+
+@functools.lru_cache
+def get_expression_regex(start_token: str, end_token: str) -> re.Pattern:
+    quotes_class = ''.join(re.escape(quote) for quote in quotes)
+    return re.compile(f'({re.escape(start_token)})|({re.escape(end_token)})|([{quotes_class}])')
+
+
+quote_regexes = {quote: re.compile(f'[{re.escape(quote)}{re.escape(escape)}]') for quote in quotes}
 
 
 class Splinter:
@@ -104,6 +133,13 @@ class Splinter:
         self.format: str = None
         self.conversion: Callable[[Any], str] = None
 
+    def copy(self) -> Splinter:
+        splinter = Splinter(self.text, self.is_code)
+        splinter.code = self.code
+        splinter.format = self.format
+        splinter.conversion = self.conversion
+        return splinter
+
     def compile(self) -> None:
         if not self.is_code or self.code:
             return
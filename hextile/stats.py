@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import Any, Callable
+
+import time
+
+
+class TranspileStats:
+    """
+    Aggregates the time spent in each phase of transpiling a junk object: running transpilers over lines, each
+    transpiler, interpolation, each transpiler command and any step transpilers measure themselves.
+
+        >>> junk = transpile('/path/to/blueprint', 'html')
+        >>> print(junk.stats.table(limit=10))
+
+    Timings are keyed by a kind (e.g. 'transpiler') and a name (e.g. 'html'); since phases nest, each timing has both
+    the total time spent in it and its own time, excluding the phases nested in it. If a tracer is set, it's called
+    with the kind, name, start time and duration of every phase as it ends.
+    """
+
+    def __init__(self, tracer: Callable[[str, str, float, float], Any] = None):
+        self.tracer = tracer
+        self.timings: dict[tuple[str, str], Timing] = {}
+        self.lines = 0
+        self._nested: list[float] = [0.0]
+
+    def __str__(self) -> str:
+        return f'transpile stats of {self.lines} lines'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def start(self) -> float:
+        self._nested.append(0.0)
+        return time.perf_counter()
+
+    def stop(self, kind: str, name: str, start: float) -> None:
+        duration = time.perf_counter() - start
+        nested = self._nested.pop()
+        self._nested[-1] += duration
+        key = kind, name
+        timing = self.timings.get(key)
+        if timing is None:
+            timing = self.timings[key] = Timing()
+        timing.count += 1
+        timing.time += duration
+        timing.own_time += duration - nested
+        if self.tracer:
+            self.tracer(kind, name, start, duration)
+
+    def table(self, limit: int = None) -> str:
+        timings = self._sorted()[:limit]
+        width = max([len('phase'), *(len(f'{kind} {name}') for (kind, name), _ in timings)])
+        output = [f'{"phase":<{width}} {"count":>10} {"time (ms)":>12} {"own (ms)":>12}']
+        for (kind, name), timing in timings:
+            output.append(f'{f"{kind} {name}":<{width}} {timing.count:>10} {timing.time * 1000:>12.3f} {timing.own_time * 1000:>12.3f}')
+        return '\n'.join(output)
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            lines = self.lines,
+            timings = [
+                dict(kind=kind, name=name, count=timing.count, time=timing.time, own_time=timing.own_time)
+                for (kind, name), timing in self._sorted()
+            ],
+        )
+
+    def _sorted(self) -> list[tuple[tuple[str, str], Timing]]:
+        return sorted(self.timings.items(), key=lambda item: item[1].own_time, reverse=True)
+
+
+class Timing:
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.own_time = 0.0
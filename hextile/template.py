@@ -0,0 +1,280 @@
+from __future__ import annotations
+from types import CodeType
+from typing import Any, BinaryIO, Callable, ContextManager, Iterable, Iterator, TextIO
+
+import contextlib
+import io
+import marshal
+import queue
+import threading
+
+
+class Template:
+    """
+    The compiled, immutable artifact of a junk object; it holds no rendering state, so the same template can be
+    rendered concurrently (e.g. from a thread pool).
+
+        >>> template = transpile('''
+        ... !for i in range(n):
+        ...     line {i}
+        ... ''').compile()
+        >>> print(template.render(n=2))
+        line 0
+        line 1
+
+        # Stream the output into a file instead of returning it as a string:
+        >>> with open('/path/to/output', 'w') as writer:
+        ...     template.render_to(writer, n=2)
+
+        # Or iterate over it in chunks:
+        >>> for chunk in template.iter_render(n=2):
+        ...     print(chunk, end='')
+
+        # Render many contexts in parallel (the results are yielded in order):
+        >>> for output in template.render_many([{'n': 1}, {'n': 2}], workers=2):
+        ...     print(output)
+        line 0
+        line 0
+        line 1
+
+        # Profile the renders in the current thread per blueprint line:
+        >>> with template.profile() as profile:
+        ...     template.render(n=1000)
+        >>> print(profile.table(limit=10))
+    """
+
+    class Cancelled(Exception):
+        pass
+
+    chunk_size = 64 * 1024
+    queue_size = 4
+    encoding = 'utf-8'
+
+    def __init__(self, name: str, code: CodeType, source_map: SourceMap = None):
+        if source_map is None:
+            source_map = SourceMap([])
+        self.name = name
+        self.code = code
+        self.source_map = source_map
+        self.code_objects = get_code_objects(code)
+
+    def __str__(self) -> str:
+        return f'template {self.name!r}'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def __reduce__(self) -> tuple[Callable[[bytes], Template], tuple[bytes]]:
+        return Template.loads, (self.dumps(),)
+
+    @classmethod
+    def loads(cls, data: bytes) -> Template:
+        name, code, origins, blocks = marshal.loads(data)
+        return cls(name, code, SourceMap(origins, blocks))
+
+    def dumps(self) -> bytes:
+        return marshal.dumps((self.name, self.code, self.source_map.origins, self.source_map.blocks))
+
+    def annotate(self, error: BaseException) -> None:
+        for name, number in self.source_map.locate(error.__traceback__, self.code_objects):
+            error.add_note(f'  in blueprint line {name}:{number}')
+
+    def profile(self) -> Profile:
+        return Profile(self)
+
+    def render(self, context: dict[str, Any] = None, /, **more_context: Any) -> str:
+        renderer = self._renderer()
+        self._run(renderer, context, more_context)
+        return '\n'.join(renderer.output)
+
+    def render_to(self, fp: TextIO|BinaryIO, context: dict[str, Any] = None, /, **more_context: Any) -> None:
+        if isinstance(fp, io.TextIOBase):
+            write = fp.write
+        else:
+            write = lambda chunk: fp.write(chunk.encode(self.encoding))
+        self._stream(write, context, more_context)
+
+    def iter_render(self, context: dict[str, Any] = None, /, **more_context: Any) -> Iterator[str]:
+        chunks: queue.Queue[tuple[None|str, None|BaseException]] = queue.Queue(self.queue_size)
+        cancelled = threading.Event()
+        profile = current_profile(self)
+        def write(chunk: str) -> None:
+            if cancelled.is_set():
+                raise self.Cancelled()
+            chunks.put((chunk, None))
+        def produce() -> None:
+            try:
+                if profile is None:
+                    self._stream(write, context, more_context)
+                else:
+                    with profile.thread():
+                        self._stream(write, context, more_context)
+            except BaseException as error:
+                chunks.put((None, error))
+            else:
+                chunks.put((None, None))
+        thread = threading.Thread(target=produce, name=f'render {self.name}', daemon=True)
+        thread.start()
+        try:
+            while True:
+                chunk, error = chunks.get()
+                if chunk is not None:
+                    yield chunk
+                    continue
+                if error is not None:
+                    raise error
+                break
+        finally:
+            if thread.is_alive():
+                cancelled.set()
+                while chunks.get()[0] is not None:
+                    pass
+            thread.join()
+
+    def render_many(
+            self,
+            contexts: Iterable[dict[str, Any]],
+            workers: int = None,
+            chunk_size: int = 1,
+    ) -> Iterator[str]:
+        if workers == 1:
+            for context in contexts:
+                yield self.render(context)
+            return
+        # Imported here since it's slow to import, and most processes that import hextile never need it.
+        import multiprocessing
+        with multiprocessing.Pool(workers, initializer=initialize_worker, initargs=(self,)) as pool:
+            yield from pool.imap(render_in_worker, contexts, chunk_size)
+
+    def _stream(self, write: Callable[[str], Any], context: None|dict[str, Any], more_context: dict[str, Any]) -> None:
+        output = RendererStream(write, self.chunk_size)
+        self._run(self._renderer(output), context, more_context)
+        output.flush()
+
+    def _renderer(self, output: list[str]|RendererStream = None) -> Renderer:
+        profile = current_profile(self)
+        if profile is None:
+            return Renderer(output)
+        return ProfilingRenderer(profile, output, self.encoding)
+
+    def _run(self, renderer: Renderer, context: None|dict[str, Any], more_context: dict[str, Any]) -> None:
+        if context is None:
+            context = {}
+            context.update(more_context)
+        context.update(renderer.builtins)
+        try:
+            exec(self.code, context)
+        except Exception as error:
+            self.annotate(error)
+            raise
+
+
+class Renderer:
+
+    def __init__(self, output: list[str]|RendererStream = None):
+        if output is None:
+            output = []
+        self.indent = 0
+        self.output = output
+
+    @property
+    def builtins(self) -> dict[str, Any]:
+        return {
+            Junk.EMIT: self.emit,
+            Junk.EMIT_BLOCK: self.emit_block,
+            Junk.CALL: self.call,
+            Junk.CAPTURE: self.capture,
+            Junk.StopTranspilation.__name__: Junk.StopTranspilation,
+        }
+
+    def emit(self, indent: int, *output: Any) -> None:
+        whitespace = ' ' * (indent + self.indent)
+        self.output.append(whitespace + ''.join(map(str, output)))
+
+    def emit_block(self, text: str) -> None:
+        if self.indent:
+            whitespace = ' ' * self.indent
+            text = whitespace + text.replace('\n', '\n' + whitespace)
+        self.output.append(text)
+
+    def call(self, indent: int, function: Callable, *args: Any, **kwargs: Any) -> None:
+        self.indent += indent
+        try:
+            function(*args, **kwargs)
+        finally:
+            self.indent -= indent
+
+    @contextlib.contextmanager
+    def capture(self) -> ContextManager[list[str]]:
+        output = self.output
+        self.output = []
+        try:
+            yield self.output
+        except Junk.StopTranspilation:
+            pass
+        finally:
+            self.output = output
+
+
+class ProfilingRenderer(Renderer):
+
+    def __init__(self, profile: Profile, output: list[str]|RendererStream = None, encoding: str = 'utf-8'):
+        super().__init__(output)
+        self.profile = profile
+        self.encoding = encoding
+
+    def emit(self, indent: int, *output: Any) -> None:
+        line = ' ' * (indent + self.indent) + ''.join(map(str, output))
+        self.output.append(line)
+        self.profile.record_emit(len(line.encode(self.encoding)) + 1)
+
+    def emit_block(self, text: str) -> None:
+        if self.indent:
+            whitespace = ' ' * self.indent
+            text = whitespace + text.replace('\n', '\n' + whitespace)
+        self.output.append(text)
+        self.profile.record_emit_block([len(line.encode(self.encoding)) + 1 for line in text.split('\n')])
+
+
+class RendererStream:
+
+    def __init__(self, write: Callable[[str], Any], chunk_size: int):
+        self.write = write
+        self.chunk_size = chunk_size
+        self._buffer: list[str] = []
+        self._size = 0
+        self._started = False
+
+    def append(self, line: str) -> None:
+        self._buffer.append(line)
+        self._size += len(line) + 1
+        if self._size >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        chunk = '\n'.join(self._buffer)
+        if self._started:
+            chunk = '\n' + chunk
+        self._buffer.clear()
+        self._size = 0
+        self._started = True
+        self.write(chunk)
+
+
+worker_template: Template = None
+
+
+def initialize_worker(template: Template) -> None:
+    global worker_template
+    worker_template = template
+
+
+def render_in_worker(context: dict[str, Any]) -> str:
+    return worker_template.render(context)
+
+
+from .junk import Junk
+from .profiler import Profile, current_profile
+from .sourcemap import SourceMap, get_code_objects
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any, Callable
 
+import functools
 import importlib
 import pathlib
 
@@ -9,6 +10,9 @@ class Transpiler:
 
     all_transpilers: dict[str, Transpiler] = {}
     core_transpilers: list[Transpiler] = []
+    lazy_transpilers: dict[str, str] = {}
+    entry_point_group = 'hextile.transpilers'
+    _discovered = False
 
     def __init__(
             self,
@@ -57,6 +61,49 @@ class Transpiler:
     def __repr__(self) -> str:
         return f'<{self}>'
     
+    @classmethod
+    def register_lazy(cls, name: str, target: str) -> None:
+        """
+        Registers a transpiler to be imported when it's first resolved by name; the target is either a module, which
+        is expected to define the transpiler with that name, or a module and an attribute (as in module:attribute).
+        """
+        cls.lazy_transpilers[name] = target
+
+    @classmethod
+    def discover(cls) -> None:
+        """
+        Registers the transpilers that installed packages advertise as entry points in the hextile.transpilers group
+        (name = module:attribute), without importing them.
+        """
+        if cls._discovered:
+            return
+        cls._discovered = True
+        # Imported here since it's slow to import, and only needed when a transpiler isn't already known.
+        import importlib.metadata
+        for entry_point in importlib.metadata.entry_points(group=cls.entry_point_group):
+            cls.lazy_transpilers.setdefault(entry_point.name, entry_point.value)
+
+    @classmethod
+    def get(cls, name: str) -> Transpiler:
+        transpiler = cls.all_transpilers.get(name)
+        if transpiler:
+            return transpiler
+        if name not in cls.lazy_transpilers:
+            cls.discover()
+        target = cls.lazy_transpilers.get(name)
+        if target:
+            module_name, _, attribute = target.partition(':')
+            module = importlib.import_module(module_name.strip())
+            if attribute:
+                transpiler = functools.reduce(getattr, attribute.strip().split('.'), module)
+                # Cache the resolution, in case the transpiler is registered under a different name (or none).
+                cls.all_transpilers.setdefault(name, transpiler)
+            transpiler = cls.all_transpilers.get(name)
+            if transpiler:
+                return transpiler
+        names = dict.fromkeys([*cls.all_transpilers, *cls.lazy_transpilers])
+        raise ValueError(f'transpiler {name!r} does not exist (expected one of: {", ".join(names)})')
+
     @classmethod
     def resolve(self, *configs: str|Transpiler, core: bool = True) -> list[Transpiler]:
         seen: set[str] = set()
@@ -71,9 +118,7 @@ class Transpiler:
                 module = importlib.import_module(module_name)
                 transpiler = getattr(module, name)
             else:
-                transpiler = Transpiler.all_transpilers.get(config)
-                if not transpiler:
-                    raise ValueError(f'transpiler {config!r} does not exist (expected one of: {", ".join(Transpiler.all_transpilers)})')
+                transpiler = Transpiler.get(config)
             transpilers.append(transpiler)
             seen.add(transpiler.name)
         if core:
@@ -108,10 +153,55 @@ class Transpiler:
         return True
 
 
+class TranspilerDispatch:
+
+    def __init__(self, transpilers: list[Transpiler]):
+        self.transpilers = transpilers
+        fallback = [index for index, transpiler in enumerate(transpilers) if transpiler._match or not transpiler.prefix]
+        characters = set()
+        for transpiler in transpilers:
+            if transpiler._match:
+                continue
+            for prefix in (transpiler.prefix, transpiler.escape_prefix):
+                if prefix:
+                    characters.add(prefix[0])
+        self.fallback = fallback
+        self.table: dict[str, list[int]] = {}
+        for character in characters:
+            self.table[character] = [
+                index for index, transpiler in enumerate(transpilers)
+                if index in fallback
+                or transpiler.prefix.startswith(character)
+                or transpiler.escape_prefix and transpiler.escape_prefix.startswith(character)
+            ]
+
+    def candidates(self, content: str, after: int = None) -> list[int]:
+        candidates = self.table.get(content[:1], self.fallback)
+        if after is None:
+            return candidates
+        return [index for index in candidates if index > after]
+
+
 class TranspilerState:
 
     def __init__(self, junk: Junk):
-        self.commands = {name: command.__get__(junk) for name, command in junk.transpiler.commands.items()}
+        self.commands: dict[str, Callable[..., None]] = {}
+        self.bind_commands(junk)
+
+    def bind_commands(self, junk: Junk) -> None:
+        # Commands can be added by transpilers loaded after the state was created (e.g. html adds meta's static).
+        for name, command in junk.transpiler.commands.items():
+            if name not in self.commands:
+                self.commands[name] = measure_command(junk, f'{junk.transpiler.name}.{name}', command)
+
+
+def measure_command(junk: Junk, name: str, command: Callable[..., None]) -> Callable[..., None]:
+    command = command.__get__(junk)
+    @functools.wraps(command)
+    def measured(*args: Any, **kwargs: Any) -> None:
+        with junk.measure('command', name):
+            return command(*args, **kwargs)
+    return measured
 
 
 def transpiler(
@@ -151,6 +241,8 @@ def transpile(
         blueprint: str|pathlib.Path|Blueprint,
         *transpilers: str|Transpiler,
         core: bool = True,
+        cache: str|pathlib.Path|JunkCache = None,
+        tracer: Callable[[str, str, float, float], Any] = None,
         **settings: Any,
 ) -> Junk:
     """
@@ -179,6 +271,13 @@ def transpile(
         ... % include(path)
         ... ''', path='/path/to/blueprint')
 
+        # Reuse the transpiled junk across processes:
+        >>> junk = transpile('/path/to/blueprint', cache='/path/to/cache')
+
+        # See where transpiling the blueprint takes time:
+        >>> junk = transpile('/path/to/blueprint', 'html')
+        >>> print(junk.stats.table())
+
     Arguments:
         blueprint: The blueprint path (as a one-line string or a path object),
             the blueprint text (as a multi-line string), or a blueprint object.
@@ -186,6 +285,10 @@ def transpile(
             names (as dotless strings), or transpiler objects.
         core: If true, core transpilers are added as well (this is the default);
             otherwise, only the specified transpilers are used.
+        cache: A junk cache (or the path to its directory); if specified, the
+            junk is loaded from it when possible, and stored in it otherwise.
+        tracer: A callback invoked with the kind, name, start time and duration
+            of every transpilation phase (see TranspileStats).
         **settings: The blueprint settings.
     
     Returns:
@@ -193,11 +296,20 @@ def transpile(
     """
     blueprint = Blueprint.resolve(blueprint, **settings)
     transpilers = Transpiler.resolve(*transpilers, core=core)
-    junk = Junk(blueprint, transpilers)
+    if cache is not None:
+        cache = JunkCache.resolve(cache)
+        key = cache.key(blueprint, transpilers)
+        junk = cache.load(key, blueprint, transpilers)
+        if junk:
+            return junk
+    junk = Junk(blueprint, transpilers, tracer)
     junk.transpile()
+    if cache is not None:
+        cache.save(key, junk)
     return junk
 
 
 from .blueprint import Blueprint, Line
+from .cache import JunkCache
 from .junk import Junk
 from .splinterpolate import Splinter
\ No newline at end of file
@@ -1,9 +1,30 @@
+from typing import Any
+
+import importlib
+
 from .code import code_transpiler
 from .text import text_transpiler
 from .meta import meta_transpiler
-from .shell import shell_transpiler
-from .filesystem import filesystem_transpiler
-from .html import html_transpiler
+from .. import Transpiler
+
+
+# Non-core transpilers are imported when they're first resolved by name or accessed here, so importing hextile
+# doesn't import them (and their dependencies).
+lazy_transpilers = {
+    'shell_transpiler': ('shell', 'shell'),
+    'filesystem_transpiler': ('fs', 'filesystem'),
+    'html_transpiler': ('html', 'html'),
+}
+for name, module_name in lazy_transpilers.values():
+    Transpiler.register_lazy(name, f'{__name__}.{module_name}')
+
+
+def __getattr__(name: str) -> Any:
+    if name not in lazy_transpilers:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    _, module_name = lazy_transpilers[name]
+    module = importlib.import_module(f'.{module_name}', __name__)
+    return getattr(module, name)
 
 
 __all__ = [
@@ -13,4 +34,4 @@ __all__ = [
     'meta_transpiler',
     'shell_transpiler',
     'text_transpiler',
-]
\ No newline at end of file
+]
@@ -1,7 +1,7 @@
 import os
 import pathlib
 
-from .. import Blueprint, Junk, Line, TranspilerState, transpiler
+from .. import Junk, Line, TranspilerState, transpiler
 
 
 class FilesystemState(TranspilerState):
@@ -54,6 +54,7 @@ def generate_directory(
     junk.emit_code(f'{state.directory_name} = pathlib.Path({path})')
     if copy:
         copy = junk.blueprint.path.parent / copy
+        junk.add_dependency(copy)
         junk.add_imports('shutil')
         junk.emit_code(f'shutil.copytree({str(copy)!r}, {state.directory_name})')
     else:
@@ -61,6 +62,7 @@ def generate_directory(
     junk.emit_code(f'os.chdir({state.directory_name})')
     if read or render:
         directory = junk.blueprint.path.parent / (read or render)
+        junk.add_dependency(directory)
         for entry in directory.iterdir():
             transpile_from(junk, entry, raw=bool(read))
     if junk.line.children:
@@ -80,6 +82,7 @@ def generate_file(
     junk.emit_code(f'{state.file_name} = pathlib.Path({path})')
     if copy:
         copy = junk.blueprint.path.parent / copy
+        junk.add_dependency(copy)
         junk.add_imports('shutil')
         junk.emit_code(f'shutil.copy({str(copy)!r}, {state.file_name})')
     elif read or render:
@@ -96,6 +99,7 @@ def generate_file(
 def transpile_from(junk: Junk, path: pathlib.Path, raw: bool = None) -> None:
     state: FilesystemState = junk.state
     if path.is_dir():
+        junk.add_dependency(path)
         junk.emit_code(f'{state.directory_name} = pathlib.Path({path.name!r})')
         junk.emit_code(f'{state.directory_name}.mkdir(exist_ok=True)')
         junk.emit_code(f'os.chdir({state.directory_name})')
@@ -112,9 +116,10 @@ def transpile_from_file(junk: Junk, path: pathlib.Path, raw: bool = None) -> Non
     if raw is None:
         raw = state.raw
     if raw:
+        junk.add_dependency(path)
         junk.emit_code(f'{state.file_name}.write_bytes({path.read_bytes()!r})')
     else:
-        blueprint = Blueprint.resolve(path)
+        blueprint = junk.load(path)
         transpile_from_lines(junk, blueprint.lines, language=path.suffix[1:])
 
 
@@ -71,6 +71,7 @@ class HTMLState(TranspilerState):
         target = static_directory / target
         target.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy(source, target)
+        junk.add_output(target)
         return os.path.relpath(target, static_directory)
 
 
@@ -321,6 +322,7 @@ def get_static(
     if isinstance(url, str) and '://' in url:
         return False, url
     source = junk.blueprint.path.parent / url
+    junk.add_dependency(source)
     if max_size is not False and source.stat().st_size > max_size:
         if name is not None:
             target = name
@@ -332,7 +334,8 @@ def get_static(
         if '://' in upload_url:
             return False, upload_url
         return False, f'{{static_path:?{state.static_path!r}}}{upload_url}'
-    data = source.read_text()
+    with junk.measure('step', 'read'):
+        data = source.read_text()
     if encode:
         data = f'data:{encode};base64,{base64.b64encode(data.encode()).decode()}'
     return True, data
@@ -343,6 +346,7 @@ def build_react_components(junk: Junk, components: Iterable[str]) -> tuple[bool,
     if not state.components_directory:
         raise RuntimeError('cannot build react components without components directory')
     components_directory = pathlib.Path(state.components_directory).absolute()
+    junk.add_dependency(components_directory)
     build_directory = state.build_directory
     if build_directory:
         cleanup = False
@@ -353,24 +357,25 @@ def build_react_components(junk: Junk, components: Iterable[str]) -> tuple[bool,
     try:
         output_filename = f'{junk.blueprint.name}.js'
         output_directory = build_directory / 'output'
-        transpile(
-            '''
-                react/ (render='./react')
-                    src/ (read=components_directory)
-                    $! npm install
-                    $! npm run build
-            ''',
-            'filesystem',
-            'shell',
-            components_directory = components_directory,
-        ).render(
-            root = build_directory,
-            output_directory = output_directory,
-            output_filename = output_filename,
-            components = components,
-            api = state.api,
-            development = state.development,
-        )
+        with junk.measure('step', 'react'):
+            transpile(
+                '''
+                    react/ (render='./react')
+                        src/ (read=components_directory)
+                        $! npm install
+                        $! npm run build
+                ''',
+                'filesystem',
+                'shell',
+                components_directory = components_directory,
+            ).render(
+                root = build_directory,
+                output_directory = output_directory,
+                output_filename = output_filename,
+                components = components,
+                api = state.api,
+                development = state.development,
+            )
         inline, bundle = True, ''
         for entry in output_directory.iterdir():
             target = state.components_directory / entry.name
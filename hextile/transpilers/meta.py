@@ -4,7 +4,7 @@ from typing import Any
 import pathlib
 
 from .text import text_transpiler
-from .. import Blueprint, Junk, Line, Transpiler, TranspilerState, transpiler
+from .. import Junk, Line, Transpiler, TranspilerState, transpiler
 
 
 class MetaState(TranspilerState):
@@ -43,10 +43,11 @@ def meta_transpiler(junk: Junk) -> None:
 def include(junk: Junk, /, blueprint: str|pathlib.Path, **settings: Any) -> None:
     if junk.line.children:
         raise junk.error('include command cannot have nested lines')
-    included = Blueprint.resolve(blueprint, relative_to=junk.blueprint.path.parent, **settings)
-    for line in included.lines:
+    included = junk.load(blueprint, **settings)
+    lines = [line.view() for line in included.lines]
+    for line in lines:
         line.shift(junk.line.indent)
-    junk.recurse(included.lines)
+    junk.recurse(lines)
 
 
 @meta_transpiler.command
@@ -75,7 +76,7 @@ def insert(junk: Junk, /, section: str, *, required: bool = False) -> None:
 def extend(junk: Junk, /, blueprint: str|pathlib.Path, **settings: Any) -> None:
     if junk.line.children:
         raise junk.error('extend command cannot have nested lines')
-    extended = Blueprint.resolve(blueprint, relative_to=junk.blueprint.path.parent, **settings)
+    extended = junk.load(blueprint, **settings)
     junk.on_complete(lambda junk: junk.transpile(extended))
 
 
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Any, Iterable, TextIO
+
+import os
+import pathlib
+import sys
+import threading
+import time
+
+
+class Watcher:
+    """
+    Polls the files a builder's targets depend on, and when they change, re-transpiles and re-renders only the
+    affected targets, keeping the rest (and their compiled templates) as they are.
+
+        >>> builder = Builder()
+        >>> builder.add('/path/to/index.blueprint', 'html', output='/path/to/index.html')
+        >>> Watcher(builder).run()
+
+    Changes are debounced: once a change is seen, the watcher waits until nothing has changed for the debounce
+    period, so that a burst of writes (e.g. an editor saving several files) results in one rebuild.
+    """
+
+    def __init__(
+            self,
+            builder: Builder,
+            interval: float = 0.5,
+            debounce: float = 0.2,
+            stream: TextIO = None,
+    ):
+        if stream is None:
+            stream = sys.stderr
+        self.builder = builder
+        self.interval = interval
+        self.debounce = debounce
+        self.stream = stream
+        self._snapshot: dict[pathlib.Path, None|tuple[int, int]] = {}
+
+    def __str__(self) -> str:
+        return f'watcher of {self.builder}'
+
+    def __repr__(self) -> str:
+        return f'<{self}>'
+
+    def snapshot(self) -> dict[pathlib.Path, None|tuple[int, int]]:
+        snapshot: dict[pathlib.Path, None|tuple[int, int]] = {}
+        for target in self.builder.targets.values():
+            for dependency in target.dependencies:
+                if dependency not in snapshot:
+                    stat_tree(dependency, snapshot)
+        return snapshot
+
+    def poll(self) -> set[pathlib.Path]:
+        snapshot = self.snapshot()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed
+
+    def wait(self, stop: threading.Event = None) -> set[pathlib.Path]:
+        if stop is None:
+            stop = threading.Event()
+        changed: set[pathlib.Path] = set()
+        last_change = None
+        while not stop.is_set():
+            new = self.poll()
+            now = time.monotonic()
+            if new:
+                changed |= new
+                last_change = now
+            elif changed and now - last_change >= self.debounce:
+                break
+            stop.wait(self.interval if not changed else min(self.interval, self.debounce))
+        return changed
+
+    def start(self) -> list[BuildTarget]:
+        self._snapshot = {}
+        start = time.perf_counter()
+        targets = self.builder.build()
+        for target in targets:
+            target.render()
+        self._snapshot = self.snapshot()
+        self.report(targets, time.perf_counter() - start)
+        return targets
+
+    def step(self, stop: threading.Event = None) -> list[BuildTarget]:
+        changed = self.wait(stop)
+        if not changed:
+            return []
+        start = time.perf_counter()
+        targets = self.builder.update(changed)
+        for target in targets:
+            target.render()
+        # The rebuilt targets may depend on new paths, which shouldn't be reported as changes on the next poll.
+        self._snapshot = self.snapshot()
+        self.report(targets, time.perf_counter() - start)
+        return targets
+
+    def run(self, stop: threading.Event = None) -> None:
+        if stop is None:
+            stop = threading.Event()
+        self.start()
+        try:
+            while not stop.is_set():
+                self.step(stop)
+        except KeyboardInterrupt:
+            pass
+
+    def report(self, targets: Iterable[BuildTarget], elapsed: float) -> None:
+        targets = list(targets)
+        for target in targets:
+            if target.error:
+                print(f'{target.path}: {type(target.error).__name__}: {target.error}', file=self.stream)
+        failed = sum(1 for target in targets if target.error)
+        print(f'built {len(targets) - failed} targets ({failed} failed) in {elapsed * 1000:.1f}ms', file=self.stream)
+
+
+def watch(builder: Builder, **options: Any) -> None:
+    Watcher(builder, **options).run()
+
+
+def stat_tree(path: pathlib.Path, snapshot: dict[pathlib.Path, None|tuple[int, int]]) -> None:
+    try:
+        stat = path.stat()
+    except OSError:
+        snapshot[path] = None
+        return
+    snapshot[path] = stat.st_mtime_ns, stat.st_size
+    if not path.is_dir():
+        return
+    # Directories are walked, since the files in them may be copied or read without being dependencies themselves.
+    for directory, directories, files in os.walk(path):
+        directory = pathlib.Path(directory)
+        for name in (*directories, *files):
+            entry = directory / name
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry] = stat.st_mtime_ns, stat.st_size
+
+
+from .builder import Builder, BuildTarget
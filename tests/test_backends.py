@@ -0,0 +1,86 @@
+import pytest
+
+from hextile import transpile
+
+
+@pytest.mark.parametrize('backend', ['module', 'function'])
+def test_context(backend):
+    junk = transpile('''
+        ! x -= 1
+        ! y = x * 2
+        ! del z
+        {x} {y}
+    ''')
+    context = dict(x=2, z=0)
+    assert junk.compile(backend=backend).render(context) == '1 2'
+    assert context['x'] == 1
+    assert context['y'] == 2
+    assert 'z' not in context
+    with pytest.raises(NameError):
+        junk.compile(backend=backend).render(z=0)
+
+
+@pytest.mark.parametrize('backend', ['module', 'function'])
+def test_functions(backend):
+    junk = transpile('''
+        ! total = 0
+        !.f(n):
+            ! global total
+            ! total += n
+            ! if n > 0:
+                {n}
+                    !.f(n - 1)
+        !.f(n)
+        total {total}
+    ''')
+    context = dict(n=3)
+    assert junk.compile(backend=backend).render(context) == '3\n    2\n        1\ntotal 6'
+    assert context['total'] == 6
+
+
+@pytest.mark.parametrize('backend', ['module', 'function'])
+def test_errors(backend):
+    junk = transpile('''
+        ! x = 1
+        ! 1/0
+    ''')
+    context = {}
+    with pytest.raises(ZeroDivisionError):
+        junk.compile(backend=backend).render(context)
+    assert context['x'] == 1
+
+
+def test_fallback():
+    junk = transpile('''
+        ! from math import *
+        {floor(pi)}
+    ''')
+    assert junk.compile(backend='function').render() == '3'
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError):
+        transpile('''
+            line
+        ''').compile(backend='invalid')
+
+
+def test_default_backend():
+    junk = transpile('''
+        ! exec('z = 3')
+        {z}
+    ''')
+    assert junk.render() == '3'
+    with pytest.raises(NameError):
+        junk.compile(backend='function').render()
+
+
+@pytest.mark.parametrize('backend', ['module', 'function'])
+def test_no_leaks(backend):
+    context = {}
+    transpile('''
+        ! y = 1
+        {y}
+    ''').compile(backend=backend).render(context)
+    assert '__render__' not in context
+    assert context['y'] == 1
@@ -0,0 +1,124 @@
+import pathlib
+
+from hextile import Blueprint, BlueprintCache, Junk, Transpiler, transpile
+from hextile.blueprint import parse_lines
+
+
+def test_parse_lines():
+    lines = parse_lines('''
+a
+    b
+        c
+    d
+e
+'''.strip())
+    assert [(line.number, line.indent, line.content) for line in lines] == [(1, 0, 'a'), (5, 0, 'e')]
+    assert [line.content for line in lines[0].children] == ['b', 'd']
+    assert lines[0].to_string() == 'a\n    b\n        c\n    d'
+
+
+def test_compact_lines():
+    lines = parse_lines('''
+a
+    x
+    x
+'''.strip())
+    assert not hasattr(lines[0], '__dict__')
+    b, c = lines[0].children
+    assert b._children is None
+    assert b.content is c.content
+    assert [child.content for child in b.view().children] == []
+    assert b._children is None
+    assert b.children == []
+
+
+def test_line_view():
+    lines = parse_lines('''
+a
+    b
+        c
+            d
+'''.strip())
+    view = lines[0].view()
+    view.shift(-6)
+    view.children[0].shift(3)
+    view.shift(2)
+    view.content = 'x'
+    assert view.to_string() == '  x\n     b\n       c\n           d'
+    assert lines[0].to_string() == 'a\n    b\n        c\n            d'
+    lines[0].shift(-6)
+    lines[0].children[0].shift(3)
+    lines[0].shift(2)
+    assert lines[0].to_string() == '  a\n     b\n       c\n           d'
+
+
+def test_transpile_twice(tmp_path: pathlib.Path):
+    path = tmp_path / 'include.blueprint'
+    path.write_text('''
+! for i in range(n):
+    {i}
+'''.strip())
+    blueprint = Blueprint.resolve(f'''
+        <p>
+            % include({str(path)!r})
+        </p>
+        !! not code
+    ''')
+    text = blueprint.lines[0].to_string()
+    outputs = []
+    for _ in range(2):
+        junk = Junk(blueprint, Transpiler.resolve())
+        junk.transpile()
+        outputs.append(junk.render(n=2))
+    assert outputs[0] == outputs[1] == '<p>\n    0\n    1\n</p>\n! not code'
+    assert blueprint.lines[0].to_string() == text
+    assert blueprint.lines[2].content == '!! not code'
+
+
+def test_blueprint_cache(tmp_path: pathlib.Path, monkeypatch):
+    cache = BlueprintCache()
+    monkeypatch.setattr(Blueprint, 'cache', cache)
+    path = tmp_path / 'include.blueprint'
+    path.write_text('item {i}')
+    junk = transpile(f'''
+        ! for i in range(3):
+            % include({str(path)!r})
+    ''')
+    assert junk.render() == 'item 0\nitem 1\nitem 2'
+    assert cache.stats['misses'] == 1
+    assert cache.stats['hits'] == 0
+    assert transpile(path).render(i=0) == 'item 0'
+    assert cache.stats['hits'] == 1
+    path.write_text('changed item {i}')
+    assert transpile(path).render(i=0) == 'changed item 0'
+    assert cache.stats['misses'] == 2
+    assert cache.stats['entries'] == 1
+    cache.max_size = 0
+    path.write_text('{i}')
+    assert transpile(path).render(i=0) == '0'
+    assert cache.stats['entries'] == cache.stats['size'] == 0
+
+
+def test_parse_lines_from_file(tmp_path: pathlib.Path):
+    text = 'a\n    b\r\n\n        c\n    d\ne\n'
+    path = tmp_path / 'stream.blueprint'
+    path.write_bytes(text.encode())
+    with path.open() as reader:
+        streamed = parse_lines(reader, 'stream')
+    parsed = parse_lines(path.read_text(), 'stream')
+    assert [line.to_string() for line in streamed] == [line.to_string() for line in parsed]
+    assert [line.number for line in streamed] == [line.number for line in parsed]
+
+
+def test_blueprint_without_text(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(Blueprint, 'cache', BlueprintCache())
+    monkeypatch.setattr(Blueprint, 'retain_text', False)
+    path = tmp_path / 'blueprint.blueprint'
+    path.write_text('!for i in range(n):\n    line {i}')
+    blueprint = Blueprint.resolve(path)
+    assert not blueprint.has_text
+    assert blueprint.text == path.read_text()
+    assert transpile(blueprint, cache=tmp_path / 'cache').render(n=2) == 'line 0\nline 1'
+    assert transpile(path, cache=tmp_path / 'cache').render(n=1) == 'line 0'
+    monkeypatch.setattr(Blueprint, 'retain_text', True)
+    assert Blueprint.resolve(path).has_text
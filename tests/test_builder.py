@@ -0,0 +1,42 @@
+import pathlib
+
+from hextile import Builder
+
+
+def test_builder(tmp_path: pathlib.Path):
+    partials = tmp_path / 'partials'
+    partials.mkdir()
+    header = partials / 'header.blueprint'
+    header.write_text('header')
+    footer = partials / 'footer.blueprint'
+    footer.write_text('footer')
+    index = tmp_path / 'index.blueprint'
+    index.write_text("% include('partials/header.blueprint')\nindex")
+    about = tmp_path / 'about.blueprint'
+    about.write_text("about\n% include('partials/footer.blueprint')")
+    builder = Builder()
+    builder.add(index)
+    builder.add(about)
+    assert len(builder.build()) == 2
+    assert builder.build() == []
+    assert builder.targets[index].junk.render() == 'header\nindex'
+    header.write_text('new header')
+    assert builder.update([header]) == [builder.targets[index]]
+    assert builder.targets[index].junk.render() == 'new header\nindex'
+    assert builder.affected([about]) == [builder.targets[about]]
+    assert builder.affected([partials]) == list(builder.targets.values())
+    assert builder.affected([tmp_path / 'other.blueprint']) == []
+
+
+def test_builder_errors(tmp_path: pathlib.Path):
+    index = tmp_path / 'index.blueprint'
+    index.write_text("% include('missing.blueprint')")
+    builder = Builder()
+    target = builder.add(index)
+    builder.build()
+    assert target.error is not None
+    assert target.junk is None
+    (tmp_path / 'missing.blueprint').write_text('found')
+    assert builder.update([tmp_path / 'missing.blueprint']) == [target]
+    assert target.error is None
+    assert target.junk.render() == 'found'
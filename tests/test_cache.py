@@ -0,0 +1,155 @@
+import marshal
+import pathlib
+import sys
+
+from hextile import Blueprint, Junk, JunkCache, Transpiler, transpile, transpiler
+from hextile.transpilers.html import HTMLState, get_static
+
+
+@transpiler(name='cache_assets', prefix='@', state=HTMLState)
+def assets_transpiler(junk: Junk) -> None:
+    inline, asset = get_static(junk, junk.line.content)
+    junk.emit_text(asset, interpolate=not inline)
+
+
+def test_cache(tmp_path: pathlib.Path, monkeypatch):
+    blueprint = tmp_path / 'page.blueprint'
+    blueprint.write_text('''
+<p>
+    % include('content.blueprint')
+</p>
+'''.strip())
+    content = tmp_path / 'content.blueprint'
+    content.write_text('content {x}')
+    cache = JunkCache(tmp_path / 'cache')
+    junk = transpile(blueprint, cache=cache)
+    assert junk.dependencies == {content}
+    assert len(list(cache.directory.iterdir())) == 1
+    transpilations = []
+    original_transpile = Junk.transpile
+    def recording_transpile(self, *args, **kwargs):
+        transpilations.append(self)
+        return original_transpile(self, *args, **kwargs)
+    monkeypatch.setattr(Junk, 'transpile', recording_transpile)
+    cached = transpile(blueprint, cache=cache)
+    assert not transpilations
+    assert cached.render(x=1) == junk.render(x=1) == '''
+<p>
+    content 1
+</p>
+'''.strip()
+    content.write_text('changed {x}')
+    changed = transpile(blueprint, cache=cache)
+    assert transpilations == [changed]
+    assert changed.render(x=1) == '''
+<p>
+    changed 1
+</p>
+'''.strip()
+
+
+def test_cache_key(tmp_path: pathlib.Path):
+    cache = JunkCache(tmp_path)
+    assert transpile('''
+        line {x}
+    ''', cache=cache).render(x=1) == 'line 1'
+    assert transpile('''
+        other {x}
+    ''', cache=cache).render(x=1) == 'other 1'
+    assert transpile('''
+        % interpolate('<', '>')
+        line <x>
+    ''', 'text', core=False, cache=cache).render(x=1) == "% interpolate('<', '>')\nline <x>"
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_cache_stale_entry(tmp_path: pathlib.Path):
+    blueprint = tmp_path / 'page.blueprint'
+    blueprint.write_text('line {x}')
+    cache = JunkCache(tmp_path / 'cache')
+    junk = transpile(blueprint, cache=cache)
+    [path] = cache.directory.iterdir()
+    for data in (
+        dict(dependencies=[], imports=[], definitions=[], code_output=[], templates={}),
+        dict(format=JunkCache.format_version, imports=[], definitions=[], code_output=[], templates={}),
+        dict(format=JunkCache.format_version, dependencies=[], transpilers=[], outputs=[], imports=[], definitions=[], code_output=[1], templates={}),
+        [1, 2, 3],
+    ):
+        path.write_bytes(marshal.dumps(data))
+        assert cache.load(path.stem, junk.blueprint, junk.transpilers) is None
+        assert transpile(blueprint, cache=cache).render(x=1) == 'line 1'
+
+
+def test_cache_key_transpiler_code(tmp_path: pathlib.Path):
+    cache = JunkCache(tmp_path)
+    blueprint = Blueprint('test', None, 'line', {})
+    namespace = {}
+    exec('def transpile(junk):\n    junk.emit_text("first")', namespace)
+    changed = {}
+    exec('def transpile(junk):\n    junk.emit_text("second")', changed)
+    assert cache.key(blueprint, [Transpiler(namespace['transpile'])]) != cache.key(blueprint, [Transpiler(changed['transpile'])])
+
+
+def test_cache_directory_dependency(tmp_path: pathlib.Path):
+    components = tmp_path / 'components'
+    (components / 'nested').mkdir(parents=True)
+    (components / 'nested' / 'button.jsx').write_text('button')
+    def bundle(junk: Junk):
+        junk.add_dependency(components)
+        for path in sorted(components.rglob('*.jsx')):
+            junk.emit_text(path.read_text())
+    cache = JunkCache(tmp_path / 'cache')
+    transpiler = Transpiler(bundle)
+    def build():
+        return transpile(tmp_path / 'page.blueprint', transpiler, core=False, cache=cache).render()
+    (tmp_path / 'page.blueprint').write_text('line')
+    assert build() == 'button'
+    assert len(list(cache.directory.iterdir())) == 1
+    (components / 'nested' / 'button.jsx').write_text('changed')
+    assert build() == 'changed'
+    (components / 'nested' / 'link.jsx').write_text('link')
+    assert build() == 'changed\nlink'
+    assert len(list(cache.directory.iterdir())) == 1
+
+
+def test_cache_activated_transpiler(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    plugin = tmp_path / 'cache_plugin.py'
+    blueprint = tmp_path / 'page.blueprint'
+    blueprint.write_text("% transpilers('cache_plugin.plugin')\n^ hi")
+    cache = JunkCache(tmp_path / 'cache')
+    def build(version: str) -> str:
+        # A new module, as if transpiling in a new process.
+        sys.modules.pop('cache_plugin', None)
+        plugin.write_text(f'''
+from hextile import Transpiler
+plugin = Transpiler(lambda junk: junk.emit_text({version!r} + ' ' + junk.line.content), prefix='^')
+''')
+        return transpile(blueprint, cache=cache).render()
+    try:
+        assert build('first') == 'first hi'
+        assert build('first') == 'first hi'
+        assert len(list(cache.directory.iterdir())) == 1
+        assert build('second') == 'second hi'
+    finally:
+        sys.modules.pop('cache_plugin', None)
+
+
+def test_cache_outputs(tmp_path: pathlib.Path):
+    (tmp_path / 'large.css').write_text('body { color: red; }\n' * 10)
+    blueprint = tmp_path / 'page.blueprint'
+    blueprint.write_text('@ large.css')
+    static_directory = tmp_path / 'static'
+    cache = JunkCache(tmp_path / 'cache')
+    def build() -> str:
+        settings = dict(static_directory=static_directory, max_include_size=10)
+        return transpile(blueprint, 'cache_assets', cache=cache, cache_assets=settings).render()
+    assert build() == '/static/large.css'
+    assert (static_directory / 'large.css').exists()
+    assert build() == '/static/large.css'
+    assert len(list(cache.directory.iterdir())) == 1
+    # A fresh static directory with a restored cache writes the asset again.
+    (static_directory / 'large.css').unlink()
+    assert build() == '/static/large.css'
+    assert (static_directory / 'large.css').read_text() == (tmp_path / 'large.css').read_text()
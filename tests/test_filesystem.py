@@ -0,0 +1,15 @@
+import pathlib
+
+from hextile import transpile
+
+
+def test_file_content(tmp_path: pathlib.Path, monkeypatch):
+    # Rendering changes the working directory.
+    monkeypatch.chdir(tmp_path)
+    transpile('''
+        dir/
+            file.txt
+                !for i in range(2):
+                    line {i}
+    ''', 'fs').render(root=tmp_path)
+    assert (tmp_path / 'dir' / 'file.txt').read_text().splitlines() == ['line 0', 'line 1']
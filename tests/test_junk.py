@@ -0,0 +1,53 @@
+from hextile import transpile
+
+
+def test_compile():
+    junk = transpile('''
+        line {x}
+    ''')
+    code = junk.compile()
+    assert junk.compile() is code
+    assert junk.render(x=1) == 'line 1'
+    assert junk.render(x=2) == 'line 2'
+    assert junk.compile() is code
+    junk.transpile()
+    assert junk.compile() is not code
+    assert junk.render(x=3) == 'line 3'
+
+
+def test_interpolation_cache():
+    junk = transpile('''
+        {x:?'default'}
+        {x:?'default'}
+        {y!r}
+        {y!r}
+    ''')
+    assert junk.render(y='y') == "default\ndefault\n'y'\n'y'"
+    assert junk.render(x='x', y='y') == "x\nx\n'y'\n'y'"
+    code = junk.to_string()
+    assert code.count('_0 = ') == code.count('_1 = ') == 2
+    assert '_2' not in code
+
+
+def test_static_text():
+    junk = transpile('''
+        !.f():
+            <p>
+                static
+            </p>
+        <div>
+            !.f()
+            %
+            <span>{{escaped}}</span>
+        </div>
+    ''')
+    assert junk.to_string().count('__emit_block__') == 3
+    assert junk.render() == '''
+<div>
+    <p>
+        static
+    </p>
+
+    <span>{escaped}</span>
+</div>
+'''.strip()
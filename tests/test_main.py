@@ -0,0 +1,41 @@
+import json
+import pathlib
+
+import pytest
+
+from hextile.__main__ import main
+
+
+def test_build(tmp_path: pathlib.Path, capsys):
+    (tmp_path / 'partial.blueprint').write_text('partial')
+    (tmp_path / 'index.blueprint').write_text("% include('partial.blueprint')\n!for i in range(n):\n    line {i}")
+    (tmp_path / 'broken.blueprint').write_text('{1 / 0}')
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps(dict(
+        cache = 'cache',
+        targets = [
+            dict(blueprint='index.blueprint', output='out/index.txt', context=dict(n=2)),
+            dict(blueprint='index.blueprint', output='out/index-3.txt', context=dict(n=3)),
+        ],
+    )))
+    for jobs in ('1', '2'):
+        assert main(['build', str(manifest), '-j', jobs, '-r', str(tmp_path / 'report.json')]) == 0
+        assert (tmp_path / 'out' / 'index.txt').read_text() == 'partial\nline 0\nline 1'
+        assert (tmp_path / 'out' / 'index-3.txt').read_text() == 'partial\nline 0\nline 1\nline 2'
+        report = json.loads((tmp_path / 'report.json').read_text())
+        assert [target['error'] for target in report['targets']] == [None, None]
+    assert list((tmp_path / 'cache').iterdir())
+    assert 'built 2 targets (0 failed)' in capsys.readouterr().err
+    manifest.write_text(json.dumps([dict(blueprint='broken.blueprint', output='out/broken.txt')]))
+    assert main(['build', str(manifest)]) == 1
+    assert 'ZeroDivisionError' in capsys.readouterr().err
+
+
+def test_build_jobs(tmp_path: pathlib.Path, capsys):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps([]))
+    for jobs in ('0', '-1', 'many'):
+        with pytest.raises(SystemExit) as info:
+            main(['build', str(manifest), '-j', jobs])
+        assert info.value.code == 2
+        assert 'expected a positive integer' in capsys.readouterr().err
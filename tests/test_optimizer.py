@@ -0,0 +1,51 @@
+import pytest
+
+from hextile import Junk, transpile
+
+
+blueprints = [
+    ('''
+        !for i in range(n):
+            line {i} of {n!r} ({i:>3})
+            static
+    ''', dict(n=3)),
+    ('''
+        !.f(n):
+            ! if n > 0:
+                item {n}: {'x' * 3}
+                    !.f(n - 1)
+        !.f(n)
+        {'-' * 5 * 2}
+    ''', dict(n=3)),
+    ('''
+        !? 1/0
+        !?
+            {missing}
+        {x:?'default'} {y:>5}
+    ''', dict(y='y')),
+]
+
+
+@pytest.mark.parametrize('blueprint, context', blueprints)
+def test_optimize(blueprint, context):
+    junk = transpile(blueprint)
+    assert junk.compile(optimize=True) is not junk.compile(optimize=False)
+    assert junk.compile(optimize=True).render(context.copy()) == junk.compile(optimize=False).render(context.copy())
+
+
+def test_optimized_code(monkeypatch):
+    junk = transpile('''
+        !.f(x):
+            a {x} b {x}
+            c
+        !.f(1)
+        !? pass
+        {'-' * 5} {str('y')}
+    ''')
+    code = junk.to_string(optimize=True)
+    assert "f'a {x!s} b {x!s}'" in code
+    assert '__emit_block__=__emit_block__' in code
+    assert "'----- y'" in code
+    assert 'try' not in code
+    monkeypatch.setattr(Junk, 'optimize', True)
+    assert junk.render() == 'a 1 b 1\nc\n----- y'
@@ -0,0 +1,77 @@
+from hextile import transpile
+
+
+def test_profile_lines():
+    junk = transpile('''
+        header
+        !for i in range(n):
+            line {i}
+        footer
+    ''')
+    with junk.profile() as profile:
+        output = junk.render(n=100)
+    assert output.splitlines()[1] == 'line 0'
+    lines = {(line['name'], line['number']): line for line in profile.to_dict()['lines']}
+    name = junk.blueprint.name
+    assert lines[name, 3]['hits'] == 100
+    assert lines[name, 3]['emitted'] == sum(len(f'line {i}') + 1 for i in range(100))
+    assert lines[name, 2]['hits'] >= 100
+    assert all(line['time'] >= 0 for line in lines.values())
+    assert profile.to_dict()['lines'][0]['time'] == max(line['time'] for line in lines.values())
+
+
+def test_profile_functions():
+    junk = transpile('''
+        !.f(n):
+            value {n}
+        !for i in range(n):
+            !.f(i)
+    ''')
+    with junk.profile() as profile:
+        junk.render(n=10)
+    functions = {function['name']: function for function in profile.to_dict()['functions']}
+    assert functions['f']['calls'] == 10
+    table = profile.table()
+    assert 'function' in table
+    assert f'{junk.blueprint.name}:2' in table
+
+
+def test_profile_scope():
+    junk = transpile('''
+        !for i in range(n):
+            line {i}
+    ''')
+    other = transpile('''
+        other
+    ''')
+    with junk.profile() as profile:
+        other.render()
+    assert profile.to_dict()['lines'] == []
+    junk.render(n=1)
+    assert profile.to_dict()['lines'] == []
+
+
+def test_profile_static_block():
+    junk = transpile('''
+        header
+        café
+        footer {x}
+    ''')
+    with junk.profile() as profile:
+        junk.render(x=1)
+    lines = {line['number']: line for line in profile.to_dict()['lines']}
+    assert {number: line['hits'] for number, line in lines.items()} == {1: 1, 2: 1, 3: 1}
+    assert {number: line['emitted'] for number, line in lines.items()} == {1: 7, 2: 6, 3: 9}
+
+
+def test_profile_iter_render():
+    junk = transpile('''
+        !for i in range(n):
+            line {i}
+    ''')
+    template = junk.compile()
+    with template.profile() as profile:
+        output = ''.join(template.iter_render(n=10))
+    assert output.splitlines()[-1] == 'line 9'
+    lines = {line['number']: line for line in profile.to_dict()['lines']}
+    assert lines[2]['hits'] == 10
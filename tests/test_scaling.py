@@ -0,0 +1,148 @@
+import math
+import os
+import pathlib
+import time
+import tracemalloc
+
+import pytest
+
+from hextile import Blueprint, Junk, JunkPlaceholder, Transpiler, transpile
+from hextile.blueprint import parse_lines
+
+
+sizes = [400, 800, 1600]
+memory_sizes = [2000, 4000, 8000]
+repeat = 3
+# A linear stage has a slope of 1 on a log-log scale and a quadratic one a slope of 2; the margin absorbs noise and
+# fixed costs, which make small sizes look slower than they are.
+max_time_slope = 1.5
+max_memory_slope = 1.3
+# Wall-clock timings depend on the machine and its load, so they're only checked on request.
+timing_tests = pytest.mark.skipif(not os.environ.get('HEXTILE_TIMING_TESTS'), reason='set HEXTILE_TIMING_TESTS to run timing tests')
+
+
+def generate(size: int) -> str:
+    lines = []
+    for k in range(size // 4):
+        lines.append(f'!if x > {k}:')
+        lines.append(f'    <p class="{k}">')
+        lines.append(f'        {{x}} and {k}')
+        lines.append('    </p>')
+    return '\n'.join(lines)
+
+
+def fit_slope(sizes: list[int], values: list[float]) -> float:
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in values]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def measure_time(run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_memory(run) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def stage_parse(size: int, tmp_path: pathlib.Path):
+    text = generate(size)
+    return lambda: parse_lines(text, 'scaling')
+
+
+def stage_transpile(size: int, tmp_path: pathlib.Path):
+    junk = Junk(Blueprint('scaling', None, generate(size), {}), Transpiler.resolve())
+    return junk.transpile
+
+
+def stage_compile(size: int, tmp_path: pathlib.Path):
+    junk = transpile(generate(size))
+    def run():
+        junk._templates.clear()
+        junk.compile()
+    return run
+
+
+def stage_render(size: int, tmp_path: pathlib.Path):
+    template = transpile(generate(size)).compile()
+    return lambda: template.render(x=size)
+
+
+def stage_include(size: int, tmp_path: pathlib.Path):
+    path = tmp_path / f'include-{size}.blueprint'
+    path.write_text(generate(size))
+    text = f'''
+        !if True:
+            <div>
+                % include({str(path)!r})
+            </div>
+    '''
+    return lambda: transpile(text)
+
+
+def stage_insert(size: int, tmp_path: pathlib.Path):
+    section = '\n'.join(f'    {line}' for line in generate(size).splitlines())
+    text = f"% define('section')\n{section}\n!if True:\n    <div>\n        % insert('section')\n    </div>"
+    return lambda: transpile(text)
+
+
+def stage_nested_align(size: int, tmp_path: pathlib.Path):
+    # Every line is a code block, so every level aligns the children of the one above it.
+    lines = []
+    for k in range(size // 8):
+        lines.append('!if True:')
+        for depth in range(1, 8):
+            lines.append('    ' * depth + ('!if True:' if depth < 7 else f'line {k}'))
+    text = '\n'.join(lines)
+    return lambda: transpile(text)
+
+
+def stage_placeholders(size: int, tmp_path: pathlib.Path):
+    placeholders: list[JunkPlaceholder] = []
+    def inject(junk: Junk):
+        for index, placeholder in enumerate(placeholders):
+            placeholder.inject([f'{junk.EMIT_BLOCK}({str(index)!r})'])
+        placeholders.clear()
+    def add_placeholder(junk: Junk):
+        placeholders.append(junk.add_placeholder(0))
+        junk.emit_text(junk.line.content)
+        junk.on_complete(inject)
+    text = '\n'.join(f'line {k}' for k in range(size))
+    return lambda: transpile(text, Transpiler(add_placeholder), core=False)
+
+
+stages = [stage_parse, stage_transpile, stage_compile, stage_render, stage_include, stage_insert, stage_nested_align, stage_placeholders]
+stage_ids = [stage.__name__.removeprefix('stage_') for stage in stages]
+
+
+@timing_tests
+@pytest.mark.parametrize('stage', stages, ids=stage_ids)
+def test_time_scaling(stage, tmp_path: pathlib.Path):
+    timings = [measure_time(stage(size, tmp_path)) for size in sizes]
+    slope = fit_slope(sizes, timings)
+    assert slope < max_time_slope, f'{stage.__name__} grows with slope {slope:.2f}: {timings}'
+
+
+@pytest.mark.parametrize('stage', stages, ids=stage_ids)
+def test_memory_scaling(stage, tmp_path: pathlib.Path):
+    peaks = [measure_memory(stage(size, tmp_path)) for size in memory_sizes]
+    slope = fit_slope(memory_sizes, peaks)
+    assert slope < max_memory_slope, f'{stage.__name__} memory grows with slope {slope:.2f}: {peaks}'
+
+
+def test_placeholders():
+    junk = stage_placeholders(4, None)()
+    assert junk.render().splitlines() == ['0', 'line 0', '1', 'line 1', '2', 'line 2', '3', 'line 3']
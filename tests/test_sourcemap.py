@@ -0,0 +1,38 @@
+import pathlib
+
+import pytest
+
+from hextile import transpile
+
+
+def test_source_map(tmp_path: pathlib.Path):
+    path = tmp_path / 'include.blueprint'
+    path.write_text('''
+included
+! y = 1 / x
+'''.strip())
+    junk = transpile(f'''
+        line
+        % include({str(path)!r})
+    ''')
+    template = junk.compile()
+    origins = set(template.source_map.to_dict().values())
+    assert ('include', 2) in origins
+    assert any(name != 'include' and number == 1 for name, number in origins)
+    with pytest.raises(ZeroDivisionError) as error:
+        junk.render(x=0)
+    assert error.value.__notes__ == ['  in blueprint line include:2']
+
+
+@pytest.mark.parametrize('backend', ['module', 'function'])
+def test_traceback(backend):
+    junk = transpile('''
+        !.f(x):
+            value {1 / x}
+        !for i in range(2, -1, -1):
+            !.f(i)
+    ''')
+    with pytest.raises(ZeroDivisionError) as error:
+        junk.compile(backend=backend).render()
+    numbers = [note.rsplit(':', 1)[1] for note in error.value.__notes__]
+    assert numbers == ['4', '2']
@@ -0,0 +1,35 @@
+import pytest
+
+from hextile import splinterpolate
+
+
+def splinters(start_token, end_token, string):
+    return [(splinter.text, splinter.is_code) for splinter in splinterpolate(start_token, end_token, string)]
+
+
+def test_splinterpolate():
+    assert splinters('{', '}', 'line') == [('line', False)]
+    assert splinters('{', '}', 'a {x} b {y}') == [('a ', False), ('x', True), (' b ', False), ('y', True)]
+    assert splinters('{', '}', '{x}{y}') == [('x', True), ('y', True)]
+    assert splinters('(|', '|)', 'f((| x |))') == [('f(', False), ('x', True), (')', False)]
+    assert splinters(None, None, '{x}') == [('{x}', False)]
+
+
+def test_escapes():
+    assert splinters('{', '}', '{{x}} {x}') == [('{x} ', False), ('x', True)]
+    assert splinters('<', '>', '<<<x>>>') == [('<', False), ('x', True), ('>', False)]
+
+
+def test_nesting_and_quotes():
+    assert splinters('{', '}', '{ {1: 2}[1] }') == [('{1: 2}[1]', True)]
+    assert splinters('{', '}', '{"}"} {\'{\'}') == [('"}"', True), (' ', False), ("'{'", True)]
+    assert splinters('{', '}', r'{"\"}"}') == [(r'"\"}"', True)]
+
+
+def test_errors():
+    with pytest.raises(ValueError, match="unmatched '}' at offset 2"):
+        splinters('{', '}', 'a } {x}')
+    with pytest.raises(ValueError, match="unmatched '{' at offset 4"):
+        splinters('{', '}', 'a {x')
+    with pytest.raises(ValueError, match='unterminated quote'):
+        splinters('{', '}', '{"x}')
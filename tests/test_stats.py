@@ -0,0 +1,34 @@
+import pathlib
+
+from hextile import transpile
+
+
+def test_stats(tmp_path: pathlib.Path):
+    path = tmp_path / 'include.blueprint'
+    path.write_text('included {x}')
+    junk = transpile(f'''
+        !for x in range(n):
+            line {{x}}
+        % include({str(path)!r})
+    ''')
+    stats = junk.stats
+    assert stats.lines == 4
+    timings = {(timing['kind'], timing['name']): timing for timing in stats.to_dict()['timings']}
+    assert timings['junk', 'transpile']['count'] == 1
+    assert timings['transpiler', 'code']['count'] == 1
+    assert timings['transpiler', 'text']['count'] == 2
+    assert timings['transpiler', 'meta']['count'] == 1
+    assert timings['command', 'meta.include']['count'] == 1
+    assert timings['junk', 'interpolate']['count'] == 2
+    total = timings['junk', 'transpile']['time']
+    assert abs(sum(timing['own_time'] for timing in timings.values()) - total) < 1e-6
+    assert 'command meta.include' in stats.table()
+
+
+def test_tracer():
+    events = []
+    transpile('''
+        line {x}
+    ''', tracer=lambda kind, name, start, duration: events.append((kind, name)))
+    assert events[-1] == ('junk', 'transpile')
+    assert events.index(('junk', 'interpolate')) < events.index(('transpiler', 'text'))
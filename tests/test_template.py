@@ -0,0 +1,83 @@
+import concurrent.futures
+
+import pytest
+
+from hextile import Template, transpile
+
+
+def test_template():
+    template = transpile('''
+        !for i in range(n):
+            line {i}
+    ''').compile()
+    assert isinstance(template, Template)
+    assert template.render(n=2) == 'line 0\nline 1'
+    assert template.render({'n': 1}) == 'line 0'
+
+
+def test_concurrent_render():
+    template = transpile('''
+        !.f(n):
+            ! if n > 0:
+                {n}
+                    !.f(n - 1)
+        !.f(n)
+    ''').compile()
+    def render(n):
+        return template.render(n=n)
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        outputs = list(executor.map(render, [20] * 50))
+    assert outputs == [render(20)] * 50
+    assert render(3) == '3\n    2\n        1'
+
+
+def test_render_to(tmp_path):
+    junk = transpile('''
+        !for i in range(n):
+            line {i}
+        ! x = 1
+        ! with __capture__() as _:
+            captured {x}
+        {'|'.join(_)}
+    ''')
+    expected = junk.render(n=1000)
+    path = tmp_path / 'output'
+    with path.open('w') as writer:
+        junk.render_to(writer, n=1000)
+    assert path.read_text() == expected
+    with path.open('wb') as writer:
+        junk.render_to(writer, n=1000)
+    assert path.read_text() == expected
+
+
+def test_iter_render(monkeypatch):
+    monkeypatch.setattr(Template, 'chunk_size', 100)
+    junk = transpile('''
+        !for i in range(n):
+            line {i}
+    ''')
+    chunks = list(junk.iter_render(n=1000))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == junk.render(n=1000)
+    assert list(transpile('''
+        !# nothing
+    ''').iter_render()) == []
+    iterator = junk.iter_render(n=1000)
+    assert next(iterator)
+    iterator.close()
+    with pytest.raises(ZeroDivisionError):
+        list(transpile('''
+            line
+            ! 1/0
+        ''').iter_render())
+
+
+def test_render_many():
+    junk = transpile('''
+        !for i in range(n):
+            line {i}
+    ''')
+    contexts = [{'n': n} for n in range(20)]
+    expected = [junk.render(n=n) for n in range(20)]
+    assert list(junk.render_many(contexts, workers=2, chunk_size=3)) == expected
+    assert list(junk.render_many(iter(contexts), workers=1)) == expected
@@ -0,0 +1,68 @@
+import importlib.metadata
+import pathlib
+import subprocess
+import sys
+
+from hextile import Transpiler, transpile
+from hextile.transpiler import TranspilerDispatch
+
+
+def test_escape_prefix():
+    assert transpile('''
+        !! not code
+        %% not meta
+        ! x = 1
+        {x}
+    ''').render() == '''
+! not code
+% not meta
+1
+'''.strip()
+
+
+def test_dispatch():
+    transpilers = Transpiler.resolve('shell')
+    dispatch = TranspilerDispatch(transpilers)
+    names = lambda candidates: [transpilers[index].name for index in candidates]
+    assert names(dispatch.candidates('! x = 1')) == ['code', 'text']
+    assert names(dispatch.candidates('$ ls')) == ['shell', 'text']
+    assert names(dispatch.candidates('line')) == ['text']
+    assert names(dispatch.candidates('')) == ['text']
+
+
+def test_lazy_transpilers():
+    code = '''
+import sys
+import hextile
+assert 'hextile.transpilers.html' not in sys.modules
+assert 'multiprocessing' not in sys.modules
+assert [transpiler.name for transpiler in hextile.Transpiler.resolve('html', core=False)] == ['html']
+assert 'hextile.transpilers.html' in sys.modules
+assert hextile.transpilers.shell_transpiler.name == 'shell'
+'''
+    root = pathlib.Path(__file__).absolute().parent.parent
+    subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
+
+
+def test_entry_points(tmp_path: pathlib.Path, monkeypatch):
+    (tmp_path / 'plugin_transpilers.py').write_text('''
+from hextile import Junk, transpiler
+
+@transpiler(name='plugin-upper', prefix='^')
+def upper(junk: Junk):
+    junk.emit_text(junk.line.content.upper())
+''')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    entry_points = importlib.metadata.EntryPoints([
+        importlib.metadata.EntryPoint('upper', 'plugin_transpilers:upper', Transpiler.entry_point_group),
+    ])
+    monkeypatch.setattr(importlib.metadata, 'entry_points', lambda group: entry_points.select(group=group))
+    monkeypatch.setattr(Transpiler, '_discovered', False)
+    monkeypatch.setattr(Transpiler, 'all_transpilers', Transpiler.all_transpilers.copy())
+    monkeypatch.setattr(Transpiler, 'lazy_transpilers', Transpiler.lazy_transpilers.copy())
+    Transpiler.discover()
+    assert 'plugin_transpilers' not in sys.modules
+    assert transpile('''
+        ^ shout
+    ''', 'upper').render() == 'SHOUT'
+    assert Transpiler.get('upper') is Transpiler.get('plugin-upper')
@@ -0,0 +1,47 @@
+import io
+import os
+import pathlib
+import threading
+
+from hextile import Builder, Watcher
+
+
+def touch(path: pathlib.Path, text: str) -> None:
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_watcher(tmp_path: pathlib.Path):
+    partial = tmp_path / 'partial.blueprint'
+    partial.write_text('partial')
+    index = tmp_path / 'index.blueprint'
+    index.write_text("% include('partial.blueprint')\nindex {n}")
+    other = tmp_path / 'other.blueprint'
+    other.write_text('other')
+    builder = Builder()
+    builder.add(index, output=tmp_path / 'out' / 'index.txt', context={'n': 1})
+    builder.add(other, output=tmp_path / 'out' / 'other.txt')
+    stream = io.StringIO()
+    watcher = Watcher(builder, interval=0.01, debounce=0.01, stream=stream)
+    assert len(watcher.start()) == 2
+    assert (tmp_path / 'out' / 'index.txt').read_text() == 'partial\nindex 1'
+    assert watcher.poll() == set()
+    touch(partial, 'changed')
+    assert watcher.step() == [builder.targets[index]]
+    assert (tmp_path / 'out' / 'index.txt').read_text() == 'changed\nindex 1'
+    assert 'built 1 targets (0 failed)' in stream.getvalue()
+
+
+def test_watcher_debounce(tmp_path: pathlib.Path):
+    index = tmp_path / 'index.blueprint'
+    index.write_text('index')
+    builder = Builder()
+    builder.add(index)
+    watcher = Watcher(builder, interval=0.01, debounce=0.05, stream=io.StringIO())
+    watcher.start()
+    stop = threading.Event()
+    stop.set()
+    assert watcher.wait(stop) == set()
+    touch(index, 'changed')
+    assert watcher.wait() == {index}